@@ -0,0 +1,465 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file implements an AVL tree stored as parallel arrays
+#              (struct-of-arrays) with integer node indices
+
+
+import random
+from array import array
+from queue_and_stack import Queue, Stack
+from bst import drop_duplicates
+
+
+# index used in place of a missing child / parent
+NIL = -1
+
+
+class ArrayAVL:
+    """
+    AVL Tree class backed by parallel arrays instead of node objects.
+
+    Node i has its value in _keys[i], its children in _left[i] and
+    _right[i], its parent in _parent[i] and its height in _height[i].
+    Slots of removed nodes are kept on a free list and reused by add().
+    All state is plain lists and arrays, so trees can be pickled.
+    """
+
+    def __init__(self, start_tree=None) -> None:
+        """
+        Initialize a new array-backed AVL Tree
+        """
+        self.make_empty()
+
+        # populate the tree with initial values (if provided)
+        if start_tree is not None:
+            for value in start_tree:
+                self.add(value)
+
+    def __str__(self) -> str:
+        """
+        Override string method; display in pre-order
+        """
+        values = []
+        stack = Stack()
+        stack.push(self._root)
+        while not stack.is_empty():
+            i = stack.pop()
+            if i != NIL:
+                values.append(str(self._keys[i]))
+                stack.push(self._right[i])
+                stack.push(self._left[i])
+        return "ArrayAVL pre-order { " + ", ".join(values) + " }"
+
+    def __len__(self) -> int:
+        """
+        Return the number of values in the tree.
+        """
+        return self._size
+
+    def __iter__(self):
+        """
+        Lazily yield the values of the tree in ascending order.
+        """
+        stack = Stack()
+        i = self._root
+        while i != NIL or not stack.is_empty():
+            while i != NIL:
+                stack.push(i)
+                i = self._left[i]
+            i = stack.pop()
+            yield self._keys[i]
+            i = self._right[i]
+
+    @classmethod
+    def bulk_load(cls, values) -> 'ArrayAVL':
+        """
+        Build a new, perfectly balanced tree from an iterable, sorting it
+        once and dropping duplicates.
+
+        Implemented with O(N) runtime complexity for sorted input and
+        O(N log N) otherwise.
+        """
+        values = list(values)
+        if any(values[i] > values[i + 1] for i in range(len(values) - 1)):
+            values.sort()
+        unique = drop_duplicates(values)
+
+        tree = cls()
+        tree._root = tree._build_balanced(unique, 0, len(unique), NIL)
+        return tree
+
+    def _build_balanced(self, values: list, lo: int, hi: int, parent: int) -> int:
+        """
+        Helper method for bulk_load. Builds a subtree from values[lo:hi]
+        and returns the index of its root.
+        """
+        if lo >= hi:
+            return NIL
+        mid = (lo + hi) // 2
+        i = self._new_node(values[mid], parent)
+        self._left[i] = self._build_balanced(values, lo, mid, i)
+        self._right[i] = self._build_balanced(values, mid + 1, hi, i)
+        self._update_height(i)
+        return i
+
+    def is_valid_avl(self) -> bool:
+        """
+        Perform pre-order traversal of the tree. Return False if heights,
+        parent links or the ordering of values are inconsistent anywhere.
+        """
+        if self._root != NIL and self._parent[self._root] != NIL:
+            return False
+        count = 0
+        stack = Stack()
+        stack.push((self._root, None, None))
+        while not stack.is_empty():
+            i, low, high = stack.pop()
+            if i == NIL:
+                continue
+            count += 1
+            key = self._keys[i]
+            if (low is not None and key <= low) or \
+                    (high is not None and key >= high):
+                return False
+            left, right = self._left[i], self._right[i]
+            if self._height[i] != 1 + max(self._h(left), self._h(right)):
+                return False
+            if abs(self._h(left) - self._h(right)) > 1:
+                return False
+            for child in (left, right):
+                if child != NIL and self._parent[child] != i:
+                    return False
+            stack.push((right, key, high))
+            stack.push((left, low, key))
+        return count == self._size
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: object) -> bool:
+        """
+        Add a new value to the tree. Duplicate values are not allowed.
+        Return True if the value was added.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        if self._root == NIL:
+            self._root = self._new_node(value, NIL)
+            return True
+
+        keys, left, right = self._keys, self._left, self._right
+        i = self._root
+        while True:
+            key = keys[i]
+            if value < key:
+                if left[i] == NIL:
+                    left[i] = self._new_node(value, i)
+                    break
+                i = left[i]
+            elif key < value:
+                if right[i] == NIL:
+                    right[i] = self._new_node(value, i)
+                    break
+                i = right[i]
+            else:
+                return False
+
+        # Retrace towards the root. After an insertion a single rotation
+        # restores the previous subtree height, so we can stop there.
+        while i != NIL:
+            old_height = self._height[i]
+            self._update_height(i)
+            top = self._rebalance(i)
+            if top != i or self._height[top] == old_height:
+                break
+            i = self._parent[i]
+        return True
+
+    def remove(self, value: object) -> bool:
+        """
+        Remove a value from the tree. Return True if it was present.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        i = self._find(value)
+        if i == NIL:
+            return False
+
+        left, right = self._left, self._right
+
+        # A node with two children takes its inorder successor's value,
+        # and the successor (which has no left child) is removed instead
+        if left[i] != NIL and right[i] != NIL:
+            successor = right[i]
+            while left[successor] != NIL:
+                successor = left[successor]
+            self._keys[i] = self._keys[successor]
+            i = successor
+
+        child = left[i] if left[i] != NIL else right[i]
+        parent = self._parent[i]
+        self._replace_child(parent, i, child)
+        if child != NIL:
+            self._parent[child] = parent
+        self._free_node(i)
+
+        # Retrace towards the root, stopping once a subtree keeps its height
+        i = parent
+        while i != NIL:
+            old_height = self._height[i]
+            self._update_height(i)
+            top = self._rebalance(i)
+            if self._height[top] == old_height and top == i:
+                break
+            i = self._parent[top]
+        return True
+
+    def contains(self, value: object) -> bool:
+        """
+        Return True if the value is in the tree.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        return self._find(value) != NIL
+
+    def inorder_traversal(self) -> Queue:
+        """
+        Return a Queue with the values of the tree in ascending order.
+
+        Implemented with O(N) runtime complexity.
+        """
+        result_queue = Queue()
+        result_queue.enqueue_many(self)
+        return result_queue
+
+    def find_min(self) -> object:
+        """
+        Return the lowest value in the tree, or None if it is empty.
+        """
+        i = self._root
+        if i == NIL:
+            return None
+        while self._left[i] != NIL:
+            i = self._left[i]
+        return self._keys[i]
+
+    def find_max(self) -> object:
+        """
+        Return the highest value in the tree, or None if it is empty.
+        """
+        i = self._root
+        if i == NIL:
+            return None
+        while self._right[i] != NIL:
+            i = self._right[i]
+        return self._keys[i]
+
+    def is_empty(self) -> bool:
+        """
+        Return True if the tree is empty.
+        """
+        return self._root == NIL
+
+    def make_empty(self) -> None:
+        """
+        Remove all of the nodes from the tree and release the arrays.
+        """
+        self._keys = []
+        self._left = array('i')
+        self._right = array('i')
+        self._parent = array('i')
+        self._height = array('b')
+        self._free = array('i')
+        self._root = NIL
+        self._size = 0
+
+    # ------------------------------------------------------------------ #
+
+    def _new_node(self, value: object, parent: int) -> int:
+        """
+        Store a new leaf with the given value and parent, reusing a
+        freed slot if there is one, and return its index.
+        """
+        self._size += 1
+        if self._free:
+            i = self._free.pop()
+            self._keys[i] = value
+            self._left[i] = NIL
+            self._right[i] = NIL
+            self._parent[i] = parent
+            self._height[i] = 0
+            return i
+        self._keys.append(value)
+        self._left.append(NIL)
+        self._right.append(NIL)
+        self._parent.append(parent)
+        self._height.append(0)
+        return len(self._keys) - 1
+
+    def _free_node(self, i: int) -> None:
+        """
+        Release slot i to the free list.
+        """
+        self._size -= 1
+        self._keys[i] = None
+        self._free.append(i)
+
+    def _find(self, value: object) -> int:
+        """
+        Return the index of the node holding value, or NIL.
+        """
+        keys, left, right = self._keys, self._left, self._right
+        i = self._root
+        while i != NIL:
+            key = keys[i]
+            if value < key:
+                i = left[i]
+            elif key < value:
+                i = right[i]
+            else:
+                return i
+        return NIL
+
+    def _h(self, i: int) -> int:
+        """
+        Return the height of node i, or -1 for NIL.
+        """
+        return self._height[i] if i != NIL else -1
+
+    def _update_height(self, i: int) -> None:
+        """
+        Update the height of node i based on the heights of its children.
+        """
+        self._height[i] = 1 + max(self._h(self._left[i]), self._h(self._right[i]))
+
+    def _get_balance(self, i: int) -> int:
+        """
+        Get the balance factor of node i.
+        """
+        return self._h(self._left[i]) - self._h(self._right[i])
+
+    def _replace_child(self, parent: int, old: int, new: int) -> None:
+        """
+        Make new take the place of old under parent (or as the root).
+        """
+        if parent == NIL:
+            self._root = new
+        elif self._left[parent] == old:
+            self._left[parent] = new
+        else:
+            self._right[parent] = new
+
+    def _rebalance(self, i: int) -> int:
+        """
+        Rebalance the subtree at node i if necessary and return the index
+        of the node now at the top of that subtree.
+        """
+        balance = self._get_balance(i)
+        if balance > 1:
+            if self._get_balance(self._left[i]) < 0:
+                self._rotate_left(self._left[i])
+            return self._rotate_right(i)
+        if balance < -1:
+            if self._get_balance(self._right[i]) > 0:
+                self._rotate_right(self._right[i])
+            return self._rotate_left(i)
+        return i
+
+    def _rotate_left(self, i: int) -> int:
+        """
+        Perform a left rotation on node i and return the new subtree top.
+        """
+        left, right, parent = self._left, self._right, self._parent
+        right_child = right[i]
+        left_of_right_child = left[right_child]
+
+        right[i] = left_of_right_child
+        if left_of_right_child != NIL:
+            parent[left_of_right_child] = i
+
+        self._replace_child(parent[i], i, right_child)
+        parent[right_child] = parent[i]
+        left[right_child] = i
+        parent[i] = right_child
+
+        self._update_height(i)
+        self._update_height(right_child)
+        return right_child
+
+    def _rotate_right(self, i: int) -> int:
+        """
+        Perform a right rotation on node i and return the new subtree top.
+        """
+        left, right, parent = self._left, self._right, self._parent
+        left_child = left[i]
+        right_of_left_child = right[left_child]
+
+        left[i] = right_of_left_child
+        if right_of_left_child != NIL:
+            parent[right_of_left_child] = i
+
+        self._replace_child(parent[i], i, left_child)
+        parent[left_child] = parent[i]
+        right[left_child] = i
+        parent[i] = left_child
+
+        self._update_height(i)
+        self._update_height(left_child)
+        return left_child
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nmethod add() example 1")
+    print("----------------------------")
+    test_cases = (
+        (1, 2, 3),  # RR
+        (3, 2, 1),  # LL
+        (1, 3, 2),  # RL
+        (3, 1, 2),  # LR
+        (10, 20, 30, 40, 50),
+        ('A', 'B', 'C', 'D', 'E'),
+        (1, 1, 1, 1),
+    )
+    for case in test_cases:
+        tree = ArrayAVL(case)
+        print('INPUT  :', case)
+        print('RESULT :', tree)
+
+    print("\nmethod remove() example 1")
+    print("-------------------------------")
+    test_cases = (
+        ((50, 40, 60, 30, 70, 20, 80, 45), 20),  # RR
+        ((50, 40, 60, 30, 70, 20, 80, 15), 40),  # LL
+        ((50, 40, 60, 30, 70, 20, 80, 35), 20),  # RL
+        ((50, 40, 60, 30, 70, 20, 80, 25), 40),  # LR
+    )
+    for case, del_value in test_cases:
+        tree = ArrayAVL(case)
+        print('INPUT  :', tree, "DEL:", del_value)
+        tree.remove(del_value)
+        print('RESULT :', tree)
+
+    print("\nstress test")
+    print("-------------------------------")
+    for _ in range(100):
+        case = list(set(random.randrange(1, 20000) for _ in range(900)))
+        tree = ArrayAVL(case)
+        for value in case[::2]:
+            tree.remove(value)
+        for value in case[::4]:
+            tree.add(value)
+        if not tree.is_valid_avl():
+            raise Exception("PROBLEM WITH ADD / REMOVE OPERATION")
+    print('add() / remove() stress test finished')
+
+    print("\nmethod inorder_traversal() example 1")
+    print("---------------------------------")
+    tree = ArrayAVL([10, 20, 5, 15, 17, 7, 12])
+    print(tree.inorder_traversal())
+    print("Minimum value is:", tree.find_min())
+    print("Maximum value is:", tree.find_max())
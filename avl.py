@@ -5,16 +5,22 @@
 # Description: This assignment implements an AVL tree
 
 
+import os
 import random
+import tempfile
 from queue_and_stack import Queue, Stack
-from bst import BSTNode, BST
+from bst import BSTNode, BST, drop_duplicates
 
 
 class AVLNode(BSTNode):
     """
     AVL Tree Node class. Inherits from BSTNode
-    DO NOT CHANGE THIS CLASS IN ANY WAY
+
+    Uses __slots__ so nodes carry no per-instance __dict__.
     """
+
+    __slots__ = ('parent', 'height')
+
     def __init__(self, value: object) -> None:
         """
         Initialize a new AVL node
@@ -40,6 +46,8 @@ class AVL(BST):
     AVL Tree class. Inherits from BST
     """
 
+    _snapshot_kind = b'avl'
+
     def __init__(self, start_tree=None) -> None:
         """
         Initialize a new AVL Tree
@@ -97,91 +105,165 @@ class AVL(BST):
         return True
 
     # ------------------------------------------------------------------ #
-    def add(self, value: object) -> None:
+    def _prepare_bulk_values(self, values: list) -> list:
+        """
+        Helper method for bulk_load. Drops duplicates from the sorted
+        values, since they are not allowed in the AVL tree.
+        """
+        return drop_duplicates(values)
+
+    def _build_balanced(self, values: list, lo: int, hi: int,
+                        parent: AVLNode = None) -> AVLNode:
+        """
+        Helper method for bulk_load. Builds an AVL subtree from
+        values[lo:hi], filling in parent pointers and heights.
+        """
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = self._make_node(values[mid])
+        node.parent = parent
+        node.left = self._build_balanced(values, lo, mid, node)
+        node.right = self._build_balanced(values, mid + 1, hi, node)
+        self._update_height(node)
+        return node
+
+    def add(self, value: object) -> bool:
         """
         Add a new value to the AVL tree.
 
-        Duplicate values are not allowed.
+        Duplicate values are not allowed. Return True if the value was
+        added and False if it was already in the tree.
+
+        The tree is descended once to find the insertion point, then the
+        parent pointers are followed back up, stopping as soon as a
+        subtree keeps its old height.
 
         Implemented with O(log N) runtime complexity.
         """
-        # Check if the value is not already in the tree
-        if not self.contains(value):
-            # Call the recursive helper function to add the value to the tree
-            self._root = self._add_recursive(self._root, value)
+        # If the tree is empty, the new node becomes the root
+        if self._root is None:
+            self._root = self._make_node(value)
+            return True
+
+        # Walk down to the empty slot where the new value belongs
+        node = self._search_start(value)
+        while True:
+            if value < node.value:
+                if node.left is None:
+                    node.left = self._make_node(value)
+                    node.left.parent = node
+                    break
+                node = node.left
+            elif value > node.value:
+                if node.right is None:
+                    node.right = self._make_node(value)
+                    node.right.parent = node
+                    break
+                node = node.right
+            else:
+                # The value is already in the tree
+                return False
+
+        self._retrace(node)
+        return True
 
-    def _add_recursive(self, node: AVLNode, value: object) -> AVLNode:
+    def remove(self, value: object) -> bool:
         """
-        Helper method for recursive addition of a value to the AVL tree.
+        Remove a value from the AVL tree. Return True if the value was
+        removed and False if it was not found.
+
+        Implemented with O(log N) runtime complexity.
         """
-        # Base case: if the current node is None, create a new node with the given value
+        # Find the node holding the value
+        node = self._search_start(value)
+        while node is not None and node.value != value:
+            if value < node.value:
+                node = node.left
+            else:
+                node = node.right
         if node is None:
-            return AVLNode(value)
-
-        # Compare the value to be added with the current node's value
-        if value < node.value:
-            node.left = self._add_recursive(node.left, value)
-            node.left.parent = node  # Update left child's parent pointer
-        elif value > node.value:
-            node.right = self._add_recursive(node.right, value)
-            node.right.parent = node  # Update right child's parent pointer
+            return False
 
-        # Update the height of the current node
-        self._update_height(node)
-
-        # Perform AVL tree balancing
-        return self._rebalance(node)
+        self._remove_node(node)
+        return True
 
-    def remove(self, value: object) -> None:
+    def _search_start(self, value: object) -> AVLNode:
+        """
+        Return the node that add() and remove() start descending from to
+        look for value. The root here; subclasses may start lower down.
         """
-        Remove a value from the AVL tree.
+        return self._root
 
-        Implemented with O(log N) runtime complexity.
+    def _remove_node(self, node: AVLNode) -> AVLNode:
+        """
+        Remove the given node from the tree and rebalance. Return the
+        node where retracing started (the parent of the node that was
+        spliced out), or None if the tree is now empty or the root was
+        spliced out.
         """
-        # Check if the value is present in the tree before attempting removal
-        if self.contains(value):
-            # Call the recursive helper function to remove the value from the tree
-            self._root = self._remove_recursive(self._root, value)
-            return True  # Return True after successful removal
-        return False  # Return False if the value is not found
+        # Node with two children: copy the inorder successor's value into
+        # this node and remove the successor (it has no left child) instead
+        if node.left is not None and node.right is not None:
+            successor = self._get_min_value_node(node.right)
+            node.value = successor.value
+            node = successor
 
-    def _remove_recursive(self, node: AVLNode, value: object) -> AVLNode:
+        # Node with only one child or no child: splice it out
+        child = node.left if node.left is not None else node.right
+        parent = node.parent
+        self._replace_child(parent, node, child)
+        if child is not None:
+            child.parent = parent
+
+        if parent is not None:
+            self._retrace(parent)
+        return parent
+
+    def _retrace(self, node: AVLNode) -> None:
         """
-        Helper method for recursive removal of a value from the AVL tree.
+        Walk from node up towards the root, updating heights and
+        rebalancing. Stops at the first subtree whose height did not
+        change, since nothing above it can be affected.
         """
-        # Base case: if the current node is None, the value is not found
-        if node is None:
-            return node
+        while node is not None:
+            old_height = node.height
+            self._update_height(node)
+            parent = node.parent
+            top = self._rebalance(node)
+            if top is not node:
+                self._replace_child(parent, node, top)
+            if top.height == old_height:
+                self._after_retrace(parent)
+                return
+            node = parent
+
+    def _after_retrace(self, node: AVLNode) -> None:
+        """
+        Called with the ancestor at which _retrace stopped early (or None).
+        Heights above that point are already correct, so the AVL tree has
+        nothing to do; subclasses keeping other subtree data override it.
+        """
+        pass
 
-        # Compare the value to be removed with the current node's value
-        if value < node.value:
-            node.left = self._remove_recursive(node.left, value)
-            if node.left:
-                node.left.parent = node  # Update left child's parent pointer
-        elif value > node.value:
-            node.right = self._remove_recursive(node.right, value)
-            if node.right:
-                node.right.parent = node  # Update right child's parent pointer
+    def _replace_child(self, parent: AVLNode, old: AVLNode, new: AVLNode) -> None:
+        """
+        Make new take the place of old as a child of parent, or as the
+        root of the tree if parent is None.
+        """
+        if parent is None:
+            self._root = new
+        elif parent.left is old:
+            parent.left = new
         else:
-            # Node with only one child or no child
-            if node.left is None:
-                return node.right
-            elif node.right is None:
-                return node.left
-
-            # Node with two children: Get the inorder successor (smallest
-            # in the right subtree)
-            successor = self._get_min_value_node(node.right)
-
-            # Copy the inorder successor's value to this node
-            node.value = successor.value
+            parent.right = new
 
-            # Delete the inorder successor
-            node.right = self._remove_recursive(node.right, successor.value)
+    def _make_node(self, value: object) -> AVLNode:
+        """
+        Create a new AVL node for the given value.
+        """
+        return AVLNode(value)
 
-        # Update height and rebalance the node
-        self._update_height(node)
-        return self._rebalance(node)
     def _get_min_value_node(self, node: AVLNode) -> AVLNode:
         """
         Get the node with the minimum value in the AVL tree.
@@ -288,6 +370,241 @@ class AVL(BST):
 
         return left_child
 
+    # ------------------------------------------------------------------ #
+    # Join-based split / join / set operations
+    #
+    # These reuse the nodes of their inputs, so the trees passed in are
+    # left empty. All of them keep heights and parent pointers valid.
+    # ------------------------------------------------------------------ #
+
+    def split(self, value: object) -> tuple:
+        """
+        Split the tree around value. Return a tuple (less, found, greater)
+        where less and greater are new trees holding the values below
+        and above value, and found tells whether value was in the tree.
+        This tree is left empty.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        left, found, right = self._split(self._root, value)
+        self._root = None
+        return self._wrap(left), found, self._wrap(right)
+
+    @classmethod
+    def join(cls, left: 'AVL', value: object, right: 'AVL') -> 'AVL':
+        """
+        Return a new tree holding every value of left, value itself and
+        every value of right. All values in left must be less than value
+        and all values in right greater. left and right are left empty.
+
+        Implemented with O(|height(left) - height(right)| + 1) runtime
+        complexity.
+        """
+        if (not left.is_empty() and not left.find_max() < value) or \
+                (not right.is_empty() and not value < right.find_min()):
+            raise ValueError("join requires left < value < right")
+        tree = cls()
+        root = tree._join(left._root, tree._make_node(value), right._root)
+        left._root = right._root = None
+        tree._root = root
+        root.parent = None
+        return tree
+
+    def union(self, other: 'AVL') -> 'AVL':
+        """
+        Return a new tree holding the values that are in either tree.
+        Both trees are left empty.
+
+        Implemented with O(M log(N / M + 1)) runtime complexity, where M
+        is the size of the smaller tree.
+        """
+        return self._consume(other, self._union(self._root, other._root))
+
+    def intersection(self, other: 'AVL') -> 'AVL':
+        """
+        Return a new tree holding the values that are in both trees.
+        Both trees are left empty.
+
+        Implemented with O(M log(N / M + 1)) runtime complexity.
+        """
+        return self._consume(other, self._intersection(self._root, other._root))
+
+    def difference(self, other: 'AVL') -> 'AVL':
+        """
+        Return a new tree holding the values of this tree that are not in
+        other. Both trees are left empty.
+
+        Implemented with O(M log(N / M + 1)) runtime complexity.
+        """
+        return self._consume(other, self._difference(self._root, other._root))
+
+    def _wrap(self, root: AVLNode) -> 'AVL':
+        """
+        Return a new tree of the same class with the given root.
+        """
+        tree = type(self)()
+        if root is not None:
+            root.parent = None
+        tree._root = root
+        return tree
+
+    def _consume(self, other: 'AVL', root: AVLNode) -> 'AVL':
+        """
+        Helper for the set operations. Empties both input trees and
+        returns a new tree with the given root.
+        """
+        self._root = other._root = None
+        return self._wrap(root)
+
+    def _order_key(self, node: AVLNode) -> object:
+        """
+        Return what _split() compares against to place node: its value.
+        """
+        return node.value
+
+    def _node_height(self, node: AVLNode) -> int:
+        """
+        Return the height of node, or -1 for an empty subtree.
+        """
+        return node.height if node is not None else -1
+
+    def _set_children(self, node: AVLNode, left: AVLNode, right: AVLNode) -> AVLNode:
+        """
+        Attach left and right as the children of node, fix their parent
+        pointers and node's height, and return node.
+        """
+        node.left = left
+        node.right = right
+        if left is not None:
+            left.parent = node
+        if right is not None:
+            right.parent = node
+        self._update_height(node)
+        return node
+
+    def _join(self, left: AVLNode, middle: AVLNode, right: AVLNode) -> AVLNode:
+        """
+        Join two subtrees and a middle node (left < middle < right) into
+        one balanced subtree and return its root.
+        """
+        if self._node_height(left) > self._node_height(right) + 1:
+            return self._join_right(left, middle, right)
+        if self._node_height(right) > self._node_height(left) + 1:
+            return self._join_left(left, middle, right)
+        return self._set_children(middle, left, right)
+
+    def _join_right(self, left: AVLNode, middle: AVLNode, right: AVLNode) -> AVLNode:
+        """
+        Helper for _join when left is the taller subtree. Walks down the
+        right spine of left until the heights are close enough to link.
+        """
+        inner = left.right
+        if self._node_height(inner) <= self._node_height(right) + 1:
+            joined = self._set_children(middle, inner, right)
+            if self._node_height(joined) <= self._node_height(left.left) + 1:
+                return self._set_children(left, left.left, joined)
+            self._set_children(left, left.left, self._rotate_right(joined))
+            return self._rotate_left(left)
+
+        joined = self._join_right(inner, middle, right)
+        self._set_children(left, left.left, joined)
+        if self._node_height(joined) <= self._node_height(left.left) + 1:
+            return left
+        return self._rotate_left(left)
+
+    def _join_left(self, left: AVLNode, middle: AVLNode, right: AVLNode) -> AVLNode:
+        """
+        Helper for _join when right is the taller subtree. Mirror image
+        of _join_right.
+        """
+        inner = right.left
+        if self._node_height(inner) <= self._node_height(left) + 1:
+            joined = self._set_children(middle, left, inner)
+            if self._node_height(joined) <= self._node_height(right.right) + 1:
+                return self._set_children(right, joined, right.right)
+            self._set_children(right, self._rotate_left(joined), right.right)
+            return self._rotate_right(right)
+
+        joined = self._join_left(left, middle, inner)
+        self._set_children(right, joined, right.right)
+        if self._node_height(joined) <= self._node_height(right.right) + 1:
+            return right
+        return self._rotate_right(right)
+
+    def _join2(self, left: AVLNode, right: AVLNode) -> AVLNode:
+        """
+        Join two subtrees (left < right) without a middle value.
+        """
+        if left is None:
+            return right
+        left, last = self._split_last(left)
+        return self._join(left, last, right)
+
+    def _split_last(self, node: AVLNode) -> tuple:
+        """
+        Detach the node with the largest value from the subtree. Return a
+        tuple (rest of the subtree, detached node).
+        """
+        if node.right is None:
+            return node.left, node
+        rest, last = self._split_last(node.right)
+        return self._join(node.left, node, rest), last
+
+    def _split(self, node: AVLNode, value: object) -> tuple:
+        """
+        Split the subtree at node around value. Return a tuple
+        (subtree below value, found, subtree above value).
+        """
+        if node is None:
+            return None, False, None
+        left, right = node.left, node.right
+        if value == node.value:
+            return left, True, right
+        if value < node.value:
+            less, found, greater = self._split(left, value)
+            return less, found, self._join(greater, node, right)
+        less, found, greater = self._split(right, value)
+        return self._join(left, node, less), found, greater
+
+    def _union(self, first: AVLNode, second: AVLNode) -> AVLNode:
+        """
+        Return the root of a subtree holding the union of two subtrees.
+        """
+        if first is None:
+            return second
+        if second is None:
+            return first
+        left, right = first.left, first.right
+        less, _, greater = self._split(second, self._order_key(first))
+        return self._join(self._union(left, less), first,
+                          self._union(right, greater))
+
+    def _intersection(self, first: AVLNode, second: AVLNode) -> AVLNode:
+        """
+        Return the root of a subtree holding the intersection of two
+        subtrees.
+        """
+        if first is None or second is None:
+            return None
+        left, right = first.left, first.right
+        less, found, greater = self._split(second, self._order_key(first))
+        left = self._intersection(left, less)
+        right = self._intersection(right, greater)
+        if found:
+            return self._join(left, first, right)
+        return self._join2(left, right)
+
+    def _difference(self, first: AVLNode, second: AVLNode) -> AVLNode:
+        """
+        Return the root of a subtree holding the values of first that are
+        not in second.
+        """
+        if first is None or second is None:
+            return first
+        less, _, greater = self._split(first, self._order_key(second))
+        return self._join2(self._difference(less, second.left),
+                           self._difference(greater, second.right))
+
 # ------------------- BASIC TESTING -----------------------------------------
 
 
@@ -465,4 +782,35 @@ if __name__ == '__main__':
     tree = AVL()
     print("Tree before make_empty():", tree)
     tree.make_empty()
-    print("Tree after make_empty(): ", tree)
\ No newline at end of file
+    print("Tree after make_empty(): ", tree)
+    print("\nmethod bulk_load() example 1")
+    print("---------------------------------")
+    for _ in range(100):
+        case = [random.randrange(1, 20000) for _ in range(900)]
+        tree = AVL.bulk_load(case)
+        if not tree.is_valid_avl():
+            raise Exception("PROBLEM WITH BULK_LOAD OPERATION")
+    print('bulk_load() stress test finished')
+
+    print("\nmethod union() example 1")
+    print("---------------------------------")
+    for _ in range(100):
+        first = set(random.randrange(1, 20000) for _ in range(900))
+        second = set(random.randrange(1, 20000) for _ in range(90))
+        for operation, expected in (('union', first | second),
+                                    ('intersection', first & second),
+                                    ('difference', first - second)):
+            tree = getattr(AVL(first), operation)(AVL(second))
+            if not tree.is_valid_avl() or list(tree) != sorted(expected):
+                raise Exception("PROBLEM WITH " + operation.upper())
+    print('union() / intersection() / difference() stress test finished')
+
+    print("\nmethod save() / load() example 1")
+    print("---------------------------------")
+    path = os.path.join(tempfile.mkdtemp(), 'avl.bin')
+    tree = AVL([10, 20, 5, 15, 17, 7, 12])
+    tree.save(path)
+    loaded = AVL.load(path)
+    print("Saved :", tree)
+    print("Loaded:", loaded, loaded.is_valid_avl())
+    os.remove(path)
@@ -0,0 +1,226 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file benchmarks the BST and the three AVL
+#              implementations over a set of reproducible workloads
+
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from queue_and_stack import Stack
+import bst
+import avl
+import correct_code
+import overflow
+from splay import zipf_keys
+
+
+TREE_CLASSES = {
+    'bst.BST': bst.BST,
+    'avl.AVL': avl.AVL,
+    'correct_code.AVL': correct_code.AVL,
+    'overflow.AVL': overflow.AVL,
+}
+
+# sorted input turns the plain BST into a linked list with O(N) adds, so
+# larger runs of those workloads would take hours
+MAX_UNBALANCED_SIZE = 20000
+
+WORKLOADS = ('sorted', 'reversed', 'random_unique', 'zipf', 'mixed', 'delete_heavy')
+
+
+def make_workload(name: str, size: int, seed: int = 0) -> tuple:
+    """
+    Return (preload, operations) for the named workload: a list of values
+    added before timing starts and a list of (operation, value) pairs,
+    where operation is 'add', 'remove' or 'contains'. The same name, size
+    and seed always give the same workload.
+    """
+    rng = random.Random(seed)
+    if name == 'sorted':
+        return [], [('add', value) for value in range(size)]
+    if name == 'reversed':
+        return [], [('add', value) for value in range(size - 1, -1, -1)]
+    if name == 'random_unique':
+        # same density as the 900 out of 1..20000 stress tests
+        space = max(size * 20000 // 900, size)
+        return [], [('add', value) for value in rng.sample(range(1, space + 1), size)]
+
+    keys = rng.sample(range(size * 10), size)
+    if name == 'zipf':
+        return keys, [('contains', value) for value in zipf_keys(keys, size, seed=seed)]
+    if name == 'mixed':
+        # 80% lookups, 10% adds, 10% removes
+        operations = []
+        for _ in range(size):
+            roll = rng.random()
+            op = 'contains' if roll < 0.8 else 'add' if roll < 0.9 else 'remove'
+            operations.append((op, rng.randrange(size * 10)))
+        return keys, operations
+    if name == 'delete_heavy':
+        # 70% removes of present values, 30% adds of new ones
+        present = list(keys)
+        operations = []
+        for _ in range(size):
+            if present and rng.random() < 0.7:
+                index = rng.randrange(len(present))
+                present[index], present[-1] = present[-1], present[index]
+                operations.append(('remove', present.pop()))
+            else:
+                value = rng.randrange(size * 10, size * 20)
+                present.append(value)
+                operations.append(('add', value))
+        return keys, operations
+    raise ValueError('unknown workload: {}'.format(name))
+
+
+def tree_height(tree) -> int:
+    """
+    Return the number of edges on the longest root-to-leaf path, or -1
+    for an empty tree. Iterative, so degenerate trees are fine.
+    """
+    height = -1
+    stack = Stack()
+    if tree.get_root() is not None:
+        stack.push((tree.get_root(), 0))
+    while not stack.is_empty():
+        node, depth = stack.pop()
+        height = max(height, depth)
+        if node.left is not None:
+            stack.push((node.left, depth + 1))
+        if node.right is not None:
+            stack.push((node.right, depth + 1))
+    return height
+
+
+def percentile(latencies: array, q: float) -> int:
+    """
+    Return the q-quantile (0 <= q <= 1) of sorted latencies.
+    """
+    if not latencies:
+        return 0
+    return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+
+def run_one(tree_class, workload: str, size: int, seed: int = 0,
+            measure_memory: bool = True) -> dict:
+    """
+    Run one workload on a fresh tree of tree_class and return its
+    results: ops_per_sec, p50_ns, p99_ns, peak_memory_bytes (None when
+    not measured), height and valid. Peak memory is measured in a second,
+    untimed run because tracing allocations slows every operation down.
+    """
+    preload, operations = make_workload(workload, size, seed)
+    tree = tree_class()
+    for value in preload:
+        tree.add(value)
+
+    calls = [(getattr(tree, op), value) for op, value in operations]
+    latencies = array('q', bytes(8 * len(calls)))
+    clock = time.perf_counter_ns
+    start = clock()
+    for index, (call, value) in enumerate(calls):
+        before = clock()
+        call(value)
+        latencies[index] = clock() - before
+    elapsed = (clock() - start) / 1e9
+
+    ordered = array('q', sorted(latencies))
+    result = {
+        'ops_per_sec': round(len(calls) / elapsed) if elapsed else 0,
+        'p50_ns': percentile(ordered, 0.50),
+        'p99_ns': percentile(ordered, 0.99),
+        'peak_memory_bytes': None,
+        'height': tree_height(tree),
+        'valid': tree.is_valid_avl() if hasattr(tree, 'is_valid_avl') else tree.is_valid_bst(),
+    }
+    del tree, calls
+
+    if measure_memory:
+        tracemalloc.start()
+        tree = tree_class()
+        for value in preload:
+            tree.add(value)
+        for op, value in operations:
+            getattr(tree, op)(value)
+        result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def run_suite(sizes=(1000, 10000, 100000), workloads=WORKLOADS,
+              tree_classes=None, seed: int = 0, measure_memory: bool = True) -> list:
+    """
+    Run every workload at every size on every tree class and return a
+    list of result dicts, each also holding tree, workload and size.
+    Runs that would take too long or that raise are reported with a
+    skipped or error entry instead of results.
+    """
+    tree_classes = tree_classes or TREE_CLASSES
+    results = []
+    for size in sizes:
+        for workload in workloads:
+            for name, tree_class in tree_classes.items():
+                row = {'tree': name, 'workload': workload, 'size': size}
+                if tree_class is bst.BST and workload in ('sorted', 'reversed') \
+                        and size > MAX_UNBALANCED_SIZE:
+                    row['skipped'] = 'degenerate tree, O(N^2) total work'
+                else:
+                    try:
+                        row.update(run_one(tree_class, workload, size, seed, measure_memory))
+                    except Exception as error:
+                        row['error'] = '{}: {}'.format(type(error).__name__, error)
+                results.append(row)
+    return results
+
+
+def format_table(results: list) -> str:
+    """
+    Return the results as a plain text comparison table.
+    """
+    header = '{:<14} {:>9} {:<17} {:>10} {:>9} {:>9} {:>11} {:>6} {:>5}'
+    lines = [header.format('workload', 'size', 'tree', 'ops/sec', 'p50 ns',
+                           'p99 ns', 'peak KiB', 'height', 'valid')]
+    for row in results:
+        if 'ops_per_sec' not in row:
+            lines.append('{:<14} {:>9} {:<17} {}'.format(
+                row['workload'], row['size'], row['tree'],
+                row.get('skipped') or row.get('error')))
+            continue
+        memory = row['peak_memory_bytes']
+        lines.append(header.format(
+            row['workload'], row['size'], row['tree'], row['ops_per_sec'],
+            row['p50_ns'], row['p99_ns'],
+            '-' if memory is None else memory // 1024,
+            row['height'], 'yes' if row['valid'] else 'NO'))
+    return '\n'.join(lines)
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    # usage: python benchmark.py [-o results.json] [size ...]
+    #        e.g. python benchmark.py -o /tmp/bench.json 1000 100000 10000000
+    # Without -o the JSON goes to the temp directory, never the repo
+    args = sys.argv[1:]
+    output = os.path.join(tempfile.gettempdir(), 'benchmark.json')
+    if args[:1] == ['-o']:
+        output, args = args[1], args[2:]
+    sizes = [int(arg) for arg in args] or [1000, 10000]
+
+    print("\nbenchmark suite (sizes {})".format(sizes))
+    print("---------------------------------")
+    results = run_suite(sizes)
+    print(format_table(results))
+    with open(output, 'w') as fp:
+        json.dump(results, fp, indent=2)
+    print('\nresults written to', output)
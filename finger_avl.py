@@ -0,0 +1,202 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file implements an AVL tree with finger search, where
+#              every search starts from the node touched last
+
+
+import random
+from avl import AVLNode, AVL
+
+
+class FingerAVL(AVL):
+    """
+    AVL Tree that remembers the last node touched (the finger) and
+    starts each contains / add / remove from there. Inherits from AVL
+
+    The search climbs parent pointers from the finger only until it
+    reaches the lowest ancestor whose subtree covers the target, then
+    descends. Targets inside the finger's small subtrees are found in
+    a few steps, which makes sequential and clustered access patterns
+    cheaper on average. With only parent pointers this is not a true
+    O(log d) finger search: neighbouring values on opposite sides of
+    the root share only the root as an ancestor, so the worst case is
+    still O(log N) even one position away.
+    """
+
+    def __init__(self, start_tree=None) -> None:
+        """
+        Initialize a new finger search AVL Tree
+        """
+        self._finger = None
+        self.finger_stats = {'searches': 0, 'exact': 0, 'local': 0,
+                             'from_root': 0, 'climbed': 0}
+        super().__init__(start_tree)
+
+    def __str__(self) -> str:
+        """
+        Override string method
+        """
+        values = []
+        super()._str_helper(self._root, values)
+        return "Finger AVL pre-order { " + ", ".join(values) + " }"
+
+    def reset_finger_stats(self) -> None:
+        """
+        Set every finger counter back to zero.
+        """
+        for name in self.finger_stats:
+            self.finger_stats[name] = 0
+
+    # ------------------------------------------------------------------ #
+
+    def contains(self, value: object) -> bool:
+        """
+        Return True if the value is in the tree. The finger moves to the
+        last node looked at.
+
+        Climbs from the previous finger to the lowest ancestor covering
+        the value, then descends. Implemented with O(log N) runtime
+        complexity in the worst case, even for a neighbouring value.
+        """
+        node = self._search_start(value)
+        while node is not None:
+            self._finger = node
+            if value == node.value:
+                return True
+            node = node.left if value < node.value else node.right
+        return False
+
+    def remove(self, value: object) -> bool:
+        """
+        Remove a value from the tree. Return True if it was present.
+        """
+        node = self._search_start(value)
+        while node is not None and node.value != value:
+            node = node.left if value < node.value else node.right
+        if node is None:
+            return False
+
+        # A node with two children stays in the tree holding the value
+        # of its successor; otherwise fall back to where retracing began
+        keeps_node = node.left is not None and node.right is not None
+        retrace_start = self._remove_node(node)
+        self._finger = node if keeps_node else (retrace_start or self._root)
+        return True
+
+    def make_empty(self) -> None:
+        """
+        Remove all of the nodes from the tree.
+        """
+        super().make_empty()
+        self._finger = None
+
+    def split(self, value: object) -> tuple:
+        """
+        Split the tree around value (see AVL.split).
+        """
+        self._finger = None
+        return super().split(value)
+
+    @classmethod
+    def join(cls, left: AVL, value: object, right: AVL) -> AVL:
+        """
+        Join two trees around value (see AVL.join).
+        """
+        for tree in (left, right):
+            if isinstance(tree, FingerAVL):
+                tree._finger = None
+        return super().join(left, value, right)
+
+    # ------------------------------------------------------------------ #
+
+    def _consume(self, other: AVL, root: AVLNode) -> AVL:
+        """
+        The set operations give the nodes of both trees to the result,
+        so neither may keep a finger into them.
+        """
+        self._finger = None
+        if isinstance(other, FingerAVL):
+            other._finger = None
+        return super()._consume(other, root)
+
+    def _make_node(self, value: object) -> AVLNode:
+        """
+        Create a new node and make it the finger.
+        """
+        node = super()._make_node(value)
+        self._finger = node
+        return node
+
+    def _search_start(self, value: object) -> AVLNode:
+        """
+        Climb from the finger to the lowest ancestor whose subtree can
+        contain value and return it.
+        """
+        stats = self.finger_stats
+        stats['searches'] += 1
+        node = self._finger
+        if node is None:
+            stats['from_root'] += 1
+            return self._root
+        if value == node.value:
+            stats['exact'] += 1
+            return node
+
+        # Going right, every ancestor we pass as a right child is below
+        # value already; the first one we reach from its left side with
+        # a larger value bounds the subtree from above (and vice versa)
+        going_right = node.value < value
+        while node.parent is not None:
+            parent = node.parent
+            stats['climbed'] += 1
+            if going_right and node is parent.left and value < parent.value:
+                break
+            if not going_right and node is parent.right and parent.value < value:
+                break
+            node = parent
+
+        if node.parent is None:
+            stats['from_root'] += 1
+        else:
+            stats['local'] += 1
+        return node
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nmethod contains() example 1")
+    print("---------------------------------")
+    tree = FingerAVL([10, 5, 15])
+    print(tree.contains(15))
+    print(tree.contains(-10))
+    print(tree.contains(15))
+
+    print("\nsequential access example 1")
+    print("---------------------------------")
+    tree = FingerAVL.bulk_load(range(0, 200000, 2))
+    tree.reset_finger_stats()
+    for value in range(0, 200000, 7):
+        tree.contains(value)
+    print(tree.finger_stats)
+
+    print("\nstress test")
+    print("---------------------------------")
+    for _ in range(100):
+        case = list(set(random.randrange(1, 20000) for _ in range(900)))
+        tree = FingerAVL()
+        for value in case:
+            tree.add(value)
+        for value in case[::2]:
+            tree.remove(value)
+        expected = set(case[1::2])
+        for value in random.sample(range(1, 20000), 200):
+            if tree.contains(value) != (value in expected):
+                raise Exception("PROBLEM WITH CONTAINS OPERATION")
+        if not tree.is_valid_avl() or list(tree) != sorted(expected):
+            raise Exception("PROBLEM WITH ADD / REMOVE OPERATION")
+    print('finger search stress test finished')
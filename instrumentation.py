@@ -0,0 +1,295 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file adds opt-in operation counters to the BST and
+#              AVL trees
+
+
+import random
+from bst import BST
+from avl import AVL
+from keyed_avl import KeyedAVL
+from persistent_avl import PersistentAVL
+from red_black import RedBlackTree
+from splay import SplayTree
+from tree_mixins import add_mixin, remove_mixin
+
+
+OPERATIONS = ('add', 'remove', 'contains')
+COUNTERS = ('calls', 'comparisons', 'nodes_visited', 'single_rotations',
+            'double_rotations', 'height_changes')
+
+
+class _Probe:
+    """
+    Stands in for the value passed to add / remove / contains and counts
+    every comparison the tree makes against it. Consecutive comparisons
+    against the same node value count as one node visited.
+    """
+
+    __slots__ = ('value', 'counts', 'last')
+
+    def __init__(self, value: object, counts: dict) -> None:
+        """
+        Initialize a probe for value that counts into counts
+        """
+        self.value = value
+        self.counts = counts
+        self.last = self
+
+    def _touch(self, other: object) -> None:
+        """
+        Count one comparison against other, and a node visited if other
+        is not the value compared against last.
+        """
+        self.counts['comparisons'] += 1
+        if other is not self.last:
+            self.counts['nodes_visited'] += 1
+            self.last = other
+
+    def __lt__(self, other):
+        """
+        Count the comparison and compare the real value.
+        """
+        self._touch(other)
+        return self.value < other
+
+    def __le__(self, other):
+        """
+        Count the comparison and compare the real value.
+        """
+        self._touch(other)
+        return self.value <= other
+
+    def __gt__(self, other):
+        """
+        Count the comparison and compare the real value.
+        """
+        self._touch(other)
+        return self.value > other
+
+    def __ge__(self, other):
+        """
+        Count the comparison and compare the real value.
+        """
+        self._touch(other)
+        return self.value >= other
+
+    def __eq__(self, other):
+        """
+        Count the comparison and compare the real value.
+        """
+        self._touch(other)
+        return self.value == other
+
+    def __ne__(self, other):
+        """
+        Count the comparison and compare the real value.
+        """
+        self._touch(other)
+        return self.value != other
+
+    def __hash__(self):
+        """
+        Hash like the real value.
+        """
+        return hash(self.value)
+
+
+class _InstrumentedTree:
+    """
+    Mixed in ahead of a tree class by instrument(). Counts go into
+    self.stats[operation] while that operation runs; rotations and
+    height changes made outside add / remove / contains are not counted.
+    """
+
+    def add(self, value: object):
+        """
+        Add value to the tree, counting the work into stats['add'].
+        """
+        return self._counted('add', super().add, value)
+
+    def remove(self, value: object):
+        """
+        Remove value from the tree, counting the work into
+        stats['remove'].
+        """
+        return self._counted('remove', super().remove, value)
+
+    def contains(self, value: object) -> bool:
+        """
+        Look value up, counting the work into stats['contains'].
+        """
+        return self._counted('contains', super().contains, value)
+
+    def _counted(self, operation: str, method, value: object):
+        """
+        Run method with a probe wrapped around value, sending the
+        counts to the given operation.
+        """
+        if isinstance(value, _Probe):
+            value = value.value
+        counts = self.stats[operation]
+        counts['calls'] += 1
+        outer = self._counts
+        self._counts = counts
+        try:
+            return method(_Probe(value, counts))
+        finally:
+            self._counts = outer
+
+    def _make_node(self, value: object):
+        """
+        Store the real value, never the probe.
+        """
+        if isinstance(value, _Probe):
+            value = value.value
+        return super()._make_node(value)
+
+    def _rebalance(self, node):
+        """
+        Count a left-right or right-left AVL rebalance once, as a double
+        rotation, instead of as the two rotations it is made of.
+        """
+        counts = self._counts
+        if counts is None:
+            return super()._rebalance(node)
+        balance = self._get_balance(node)
+        double = (balance > 1 and self._get_balance(node.left) < 0) or \
+            (balance < -1 and self._get_balance(node.right) > 0)
+        if not double:
+            return super()._rebalance(node)
+        counts['double_rotations'] += 1
+        self._in_double = True
+        try:
+            return super()._rebalance(node)
+        finally:
+            self._in_double = False
+
+    def _rotate_left(self, node):
+        """
+        Count the rotation, unless it is half of a double rotation.
+        """
+        self._count_rotation()
+        return super()._rotate_left(node)
+
+    def _rotate_right(self, node):
+        """
+        Count the rotation, unless it is half of a double rotation.
+        """
+        self._count_rotation()
+        return super()._rotate_right(node)
+
+    def _count_rotation(self) -> None:
+        """
+        Add one single rotation to the running operation's counts.
+        """
+        if self._counts is not None and not self._in_double:
+            self._counts['single_rotations'] += 1
+
+    def _update_height(self, node) -> None:
+        """
+        Count the node heights that actually change.
+        """
+        old_height = node.height
+        super()._update_height(node)
+        if self._counts is not None and node.height != old_height:
+            self._counts['height_changes'] += 1
+
+
+def instrument(tree: BST) -> dict:
+    """
+    Start counting comparisons, nodes visited, single and double
+    rotations and height changes for every add, remove and contains on
+    tree. Return the live stats dict, which maps each operation to its
+    counters and is also available as tree.stats.
+
+    The counters are added with add_mixin(). Works with BST, AVL and
+    subclasses that create nodes through _make_node(), compare the
+    values themselves and rotate through _rotate_left() and
+    _rotate_right(). Rotations outside an AVL rebalance (such as a
+    RedBlackTree's) are each counted as single rotations. TypeError is
+    raised for the trees whose work would be miscounted: a KeyedAVL
+    compares cached keys and would pass the probe to its key function,
+    and a SplayTree or PersistentAVL restructures itself without those
+    rotation methods, so its rotations would read as zero.
+    """
+    if not isinstance(tree, BST):
+        raise TypeError('can only instrument BST based trees')
+    if isinstance(tree, KeyedAVL):
+        raise TypeError('cannot instrument a KeyedAVL, which compares cached keys')
+    if isinstance(tree, (SplayTree, PersistentAVL)):
+        raise TypeError('cannot instrument a {}, whose rotations are not '
+                        'counted'.format(type(tree).__name__))
+    if not isinstance(tree, _InstrumentedTree):
+        tree._counts = None
+        tree._in_double = False
+        tree.stats = {}
+        reset_stats(tree)
+        add_mixin(tree, _InstrumentedTree)
+    return tree.stats
+
+
+def reset_stats(tree: BST) -> None:
+    """
+    Set every counter of an instrumented tree back to zero.
+    """
+    for operation in OPERATIONS:
+        tree.stats[operation] = dict.fromkeys(COUNTERS, 0)
+
+
+def uninstrument(tree: BST) -> dict:
+    """
+    Stop counting and return the final stats dict.
+    """
+    remove_mixin(tree, _InstrumentedTree)
+    stats = tree.stats
+    del tree.stats, tree._counts, tree._in_double
+    return stats
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nAVL sorted adds example 1")
+    print("---------------------------------")
+    tree = AVL()
+    stats = instrument(tree)
+    for value in range(1000):
+        tree.add(value)
+    print(stats['add'])
+
+    print("\nAVL mixed operations example 1")
+    print("---------------------------------")
+    reset_stats(tree)
+    for value in random.sample(range(2000), 1000):
+        tree.contains(value)
+        tree.remove(value)
+    for operation in OPERATIONS:
+        print(operation, stats[operation])
+
+    print("\nred-black mixed operations example 1")
+    print("---------------------------------")
+    tree = RedBlackTree()
+    stats = instrument(tree)
+    for value in random.sample(range(4000), 2000):
+        tree.add(value)
+        if random.random() < 0.3:
+            tree.remove(value)
+    print('add', stats['add'])
+    print('remove', stats['remove'])
+    print('rotations seen by the tree itself:', tree.rotations)
+
+    print("\nBST contains example 1")
+    print("---------------------------------")
+    tree = BST(random.sample(range(1000), 1000))
+    instrument(tree)
+    for value in range(1000):
+        tree.contains(value)
+    stats = uninstrument(tree)
+    print(stats['contains'])
+    print('average nodes visited: {:.1f}'.format(
+        stats['contains']['nodes_visited'] / stats['contains']['calls']))
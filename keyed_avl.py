@@ -0,0 +1,464 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file implements an AVL tree ordered by a key function,
+#              with the keys cached on the nodes
+
+
+import os
+import random
+import tempfile
+import time
+from operator import itemgetter
+from queue_and_stack import Stack
+from avl import AVLNode, AVL
+
+
+class KeyedAVLNode(AVLNode):
+    """
+    Keyed AVL Tree Node class. Inherits from AVLNode
+    """
+
+    __slots__ = ('key',)
+
+    def __init__(self, value: object, key: object) -> None:
+        """
+        Initialize a new node holding value and its cached key
+        """
+        super().__init__(value)
+        self.key = key
+
+
+def _identity(value: object) -> object:
+    """
+    Default key function: order values by themselves.
+    """
+    return value
+
+
+class KeyedAVL(AVL):
+    """
+    AVL Tree ordered by key(value), like sorted(values, key=key).
+    Inherits from AVL
+
+    The key of each value is computed once, when it is inserted, and
+    cached on its node. Descents make a single < comparison of cached
+    keys per level and test for equality once at the bottom, instead of
+    the <, > and == on every level of the AVL tree. Keys only need to
+    support <. Two values with equal keys count as duplicates.
+
+    add(), remove() and contains() take values; get(), range(),
+    iter_from(), count_range() and split() take keys.
+    """
+
+    # keyed snapshots are ordered by a key function that is not stored,
+    # so plain AVL and BST loads must not accept them
+    _snapshot_kind = b'kavl'
+
+    def __init__(self, start_tree=None, key=None) -> None:
+        """
+        Initialize a new keyed AVL Tree
+        """
+        self._key = key if key is not None else _identity
+        super().__init__(start_tree)
+
+    def __str__(self) -> str:
+        """
+        Override string method
+        """
+        values = []
+        super()._str_helper(self._root, values)
+        return "Keyed AVL pre-order { " + ", ".join(values) + " }"
+
+    def is_valid_avl(self) -> bool:
+        """
+        Perform pre-order traversal of the tree. Return False if the
+        cached keys are out of order or out of date, or if heights or
+        parent pointers are wrong.
+        """
+        if self._root is not None and self._root.parent is not None:
+            return False
+        stack = Stack()
+        stack.push((self._root, None, None))
+        while not stack.is_empty():
+            node, low, high = stack.pop()
+            if node is None:
+                continue
+            key = node.key
+            if (low is not None and not low < key) or \
+                    (high is not None and not key < high):
+                return False
+            if self._key(node.value) != key:
+                return False
+            left_height = node.left.height if node.left else -1
+            right_height = node.right.height if node.right else -1
+            if node.height != 1 + max(left_height, right_height):
+                return False
+            for child in (node.left, node.right):
+                if child is not None and child.parent is not node:
+                    return False
+            stack.push((node.right, key, high))
+            stack.push((node.left, low, key))
+        return True
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: object) -> bool:
+        """
+        Add a new value to the tree. Return True if it was added and
+        False if a value with the same key is already in the tree.
+
+        Implemented with O(log N) runtime complexity and one key call.
+        """
+        key = self._key(value)
+        parent = None
+        candidate = None
+        node = self._root
+        go_left = False
+        while node is not None:
+            parent = node
+            go_left = key < node.key
+            if go_left:
+                node = node.left
+            else:
+                # node.key <= key: remember the largest such node
+                candidate = node
+                node = node.right
+        if candidate is not None and not candidate.key < key:
+            return False
+
+        node = KeyedAVLNode(value, key)
+        node.parent = parent
+        if parent is None:
+            self._root = node
+            return True
+        if go_left:
+            parent.left = node
+        else:
+            parent.right = node
+        self._retrace(parent)
+        return True
+
+    def remove(self, value: object) -> bool:
+        """
+        Remove the value with the same key as value. Return True if one
+        was present.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        node = self._find_node(self._key(value))
+        if node is None:
+            return False
+        self._remove_node(node)
+        return True
+
+    def contains(self, value: object) -> bool:
+        """
+        Return True if a value with the same key as value is in the tree.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        return self._find_node(self._key(value)) is not None
+
+    def get(self, key: object, default: object = None) -> object:
+        """
+        Return the value stored under key, or default if there is none.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        node = self._find_node(key)
+        return node.value if node is not None else default
+
+    def range(self, lo: object, hi: object, inclusive=(True, True)):
+        """
+        Lazily yield, in key order, every value whose key is between the
+        keys lo and hi (see BST.range).
+        """
+        if isinstance(inclusive, bool):
+            inclusive = (inclusive, inclusive)
+        lo_inclusive, hi_inclusive = inclusive
+
+        stack = self._start_stack(lo, not lo_inclusive)
+        while not stack.is_empty():
+            node = stack.pop()
+            if hi < node.key or (not hi_inclusive and not node.key < hi):
+                return
+            yield node.value
+            self._push_left_spine(node.right, stack)
+
+    @classmethod
+    def bulk_load(cls, values, key=None) -> 'KeyedAVL':
+        """
+        Build a new, perfectly balanced tree from an iterable, calling
+        key once per value. Of values with equal keys the first is kept,
+        as add() would.
+
+        Implemented with O(N log N) runtime complexity.
+        """
+        tree = cls(key=key)
+        pairs = [(tree._key(value), value) for value in values]
+        # stable sort on the keys alone, which only need <
+        pairs.sort(key=itemgetter(0))
+        pairs = tree._prepare_bulk_values(pairs)
+        tree._root = tree._build_balanced(pairs, 0, len(pairs))
+        return tree
+
+    @classmethod
+    def load(cls, path: str, key=None) -> 'KeyedAVL':
+        """
+        Read a file written by save() (see BST.load). Keys are not
+        stored in the file, so they are computed again with key, which
+        must be the key function the tree was saved with (the identity
+        when None). Raise ValueError if the loaded values are not in
+        order under key.
+        """
+        tree = super().load(path)
+        if key is not None:
+            tree._key = key
+            stack = Stack()
+            stack.push(tree._root)
+            while not stack.is_empty():
+                node = stack.pop()
+                if node is not None:
+                    node.key = key(node.value)
+                    stack.push(node.right)
+                    stack.push(node.left)
+        if not tree.is_valid_avl():
+            raise ValueError("snapshot is not ordered by the given key function")
+        return tree
+
+    @classmethod
+    def join(cls, left: 'KeyedAVL', value: object, right: 'KeyedAVL') -> 'KeyedAVL':
+        """
+        Return a new tree holding every value of left, value itself and
+        every value of right, ordered by the key function of left (see
+        AVL.join).
+        """
+        middle = left._make_node(value)
+        if (left._root is not None and not left._get_max_node(left._root).key < middle.key) or \
+                (right._root is not None and not middle.key < left._get_min_value_node(right._root).key):
+            raise ValueError("join requires left < value < right")
+        tree = cls(key=left._key)
+        root = tree._join(left._root, middle, right._root)
+        left._root = right._root = None
+        tree._root = root
+        root.parent = None
+        return tree
+
+    # ------------------------------------------------------------------ #
+
+    def _find_node(self, key: object) -> KeyedAVLNode:
+        """
+        Return the node whose key equals key, or None. One < per level:
+        the last node passed on the right is the only possible match.
+        """
+        candidate = None
+        node = self._root
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            else:
+                candidate = node
+                node = node.right
+        if candidate is not None and not candidate.key < key:
+            return candidate
+        return None
+
+    def _get_max_node(self, node: KeyedAVLNode) -> KeyedAVLNode:
+        """
+        Get the node with the largest key in the subtree.
+        """
+        while node.right is not None:
+            node = node.right
+        return node
+
+    def _remove_node(self, node: KeyedAVLNode) -> KeyedAVLNode:
+        """
+        Remove the given node (see AVL._remove_node), moving the key
+        along with the value when the successor takes its place.
+        """
+        if node.left is not None and node.right is not None:
+            successor = self._get_min_value_node(node.right)
+            node.value, node.key = successor.value, successor.key
+            node = successor
+        return super()._remove_node(node)
+
+    def _make_node(self, value: object) -> KeyedAVLNode:
+        """
+        Create a new node for value, computing its key.
+        """
+        return KeyedAVLNode(value, self._key(value))
+
+    def _start_stack(self, key: object, strict: bool) -> Stack:
+        """
+        Helper method for the ordered iterators (see BST._start_stack),
+        comparing cached keys.
+        """
+        stack = Stack()
+        node = self._root
+        while node is not None:
+            if node.key < key or (strict and not key < node.key):
+                node = node.right
+            else:
+                stack.push(node)
+                node = node.left
+        return stack
+
+    def _prepare_bulk_values(self, pairs: list) -> list:
+        """
+        Helper method for bulk_load. Drops every (key, value) pair whose
+        key equals the key before it.
+        """
+        unique = []
+        for pair in pairs:
+            if not unique or unique[-1][0] < pair[0]:
+                unique.append(pair)
+        return unique
+
+    def _build_balanced(self, pairs: list, lo: int, hi: int,
+                        parent: KeyedAVLNode = None) -> KeyedAVLNode:
+        """
+        Helper method for bulk_load. Builds a subtree from the sorted
+        (key, value) pairs[lo:hi] and returns its root.
+        """
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        key, value = pairs[mid]
+        node = KeyedAVLNode(value, key)
+        node.parent = parent
+        node.left = self._build_balanced(pairs, lo, mid, node)
+        node.right = self._build_balanced(pairs, mid + 1, hi, node)
+        self._update_height(node)
+        return node
+
+    def _wrap(self, root: KeyedAVLNode) -> 'KeyedAVL':
+        """
+        Return a new tree with the same key function and the given root.
+        """
+        tree = type(self)(key=self._key)
+        if root is not None:
+            root.parent = None
+        tree._root = root
+        return tree
+
+    def _order_key(self, node: KeyedAVLNode) -> object:
+        """
+        The set operations split by the cached key.
+        """
+        return node.key
+
+    def _split(self, node: KeyedAVLNode, key: object) -> tuple:
+        """
+        Split the subtree at node around key (see AVL._split).
+        """
+        if node is None:
+            return None, False, None
+        left, right = node.left, node.right
+        if key < node.key:
+            less, found, greater = self._split(left, key)
+            return less, found, self._join(greater, node, right)
+        if node.key < key:
+            less, found, greater = self._split(right, key)
+            return self._join(left, node, less), found, greater
+        return left, True, right
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nmethod add() example 1")
+    print("----------------------------")
+    tree = KeyedAVL(['pear', 'Fig', 'apple', 'Banana'], key=str.lower)
+    print(tree)
+    print(list(tree))
+    print(tree.add('FIG'), tree.contains('APPLE'), tree.get('banana'))
+
+    print("\nmethod range() example 1")
+    print("----------------------------")
+    tree = KeyedAVL.bulk_load([(3, 'c'), (1, 'a'), (2, 'b'), (5, 'e')], key=itemgetter(0))
+    print(list(tree.range(2, 4)))
+
+    print("\nmethod load() example 1")
+    print("----------------------------")
+    path = os.path.join(tempfile.gettempdir(), 'keyed_avl_example.snap')
+    KeyedAVL(['pear', 'Fig', 'apple', 'Banana'], key=str.lower).save(path)
+    print(KeyedAVL.load(path, key=str.lower))
+    for load in (AVL.load, KeyedAVL.load):
+        try:
+            load(path)
+        except ValueError as error:
+            print(error)
+    os.remove(path)
+
+    print("\nstress test")
+    print("---------------------------------")
+    for _ in range(100):
+        case = list(set(random.randrange(1, 20000) for _ in range(900)))
+        tree = KeyedAVL((-value for value in case), key=abs)
+        for value in case[::2]:
+            tree.remove(value)
+        expected = sorted(-value for value in case[1::2])[::-1]
+        if not tree.is_valid_avl() or list(tree) != expected:
+            raise Exception("PROBLEM WITH ADD / REMOVE OPERATION")
+        other = KeyedAVL.bulk_load((-value for value in case[::3]), key=abs)
+        union = tree.union(other)
+        if not union.is_valid_avl() or \
+                sorted(union, key=abs) != sorted(set(expected) | {-v for v in case[::3]}, key=abs):
+            raise Exception("PROBLEM WITH UNION OPERATION")
+    print('add() / remove() stress test finished')
+
+    print("\ncomposite records (50000 lookups)")
+    print("---------------------------------")
+
+    class Record:
+        """
+        Record ordered by (last, first, number) with Python-level rich
+        comparisons, which is what makes plain AVL descents expensive.
+        """
+
+        __slots__ = ('last', 'first', 'number')
+
+        def __init__(self, last: str, first: str, number: int) -> None:
+            """
+            Initialize a new record
+            """
+            self.last, self.first, self.number = last, first, number
+
+        def fields(self) -> tuple:
+            """
+            Return the fields the records are ordered by.
+            """
+            return self.last, self.first, self.number
+
+        def __lt__(self, other) -> bool:
+            """
+            Compare records by their fields.
+            """
+            return self.fields() < other.fields()
+
+        def __gt__(self, other) -> bool:
+            """
+            Compare records by their fields.
+            """
+            return other.fields() < self.fields()
+
+        def __eq__(self, other) -> bool:
+            """
+            Compare records by their fields.
+            """
+            return self.fields() == other.fields()
+
+    names = ['smith', 'jones', 'garcia', 'lee', 'brown']
+    records = [Record(random.choice(names), random.choice(names), number)
+               for number in range(50000)]
+    lookups = random.sample(records, 50000)
+    for tree in (AVL(records), KeyedAVL(records, key=Record.fields)):
+        start = time.perf_counter()
+        for record in lookups:
+            tree.contains(record)
+        print('{:<9} {:>10.0f} lookups/sec'.format(
+            type(tree).__name__, len(lookups) / (time.perf_counter() - start)))
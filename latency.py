@@ -0,0 +1,269 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file records per-operation latency histograms for the
+#              trees and exports them as JSON or Prometheus text
+
+
+import json
+import os
+import random
+import tempfile
+import time
+from avl import AVL
+from tree_mixins import add_mixin, remove_mixin
+
+
+OPERATIONS = ('contains', 'add', 'remove', 'inorder_traversal')
+QUANTILES = (0.5, 0.9, 0.99)
+
+# latencies keep this many significant bits, so a reported value is at
+# most 1 / 2 ** (SIGNIFICANT_BITS - 1) (under 1%) above the real one
+SIGNIFICANT_BITS = 8
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of latencies in nanoseconds. Values below
+    2 ** SIGNIFICANT_BITS are kept exactly; larger ones are grouped into
+    buckets that keep their top SIGNIFICANT_BITS bits, so the memory used
+    grows with the log of the range of values, not with their number.
+    """
+
+    def __init__(self, sample_every: int = 1) -> None:
+        """
+        Initialize an empty histogram that records one call out of every
+        sample_every.
+        """
+        if sample_every < 1:
+            raise ValueError('sample_every must be at least 1')
+        self.sample_every = sample_every
+        self.calls = 0
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._buckets = {}
+
+    def record(self, nanoseconds: int) -> None:
+        """
+        Add one latency to the histogram.
+        """
+        self.count += 1
+        self.total += nanoseconds
+        if nanoseconds > self.max:
+            self.max = nanoseconds
+        shift = nanoseconds.bit_length() - SIGNIFICANT_BITS
+        if shift > 0:
+            nanoseconds = nanoseconds >> shift << shift
+        self._buckets[nanoseconds] = self._buckets.get(nanoseconds, 0) + 1
+
+    def percentile(self, q: float) -> int:
+        """
+        Return the latency below which a fraction q of the recorded
+        calls fall, as the top of its bucket (never above max).
+        """
+        if not self.count:
+            return 0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for low in sorted(self._buckets):
+            seen += self._buckets[low]
+            if seen >= rank:
+                shift = low.bit_length() - SIGNIFICANT_BITS
+                high = low + (1 << shift) - 1 if shift > 0 else low
+                return min(high, self.max)
+        return self.max
+
+    def reset(self) -> None:
+        """
+        Forget all recorded latencies.
+        """
+        self.calls = self.count = self.total = self.max = 0
+        self._buckets = {}
+
+    def summary(self) -> dict:
+        """
+        Return calls, sampled count, mean, p50 / p90 / p99 and max, with
+        latencies in nanoseconds.
+        """
+        result = {'calls': self.calls, 'sampled': self.count,
+                  'mean_ns': round(self.total / self.count) if self.count else 0}
+        for q in QUANTILES:
+            result['p{:g}_ns'.format(q * 100)] = self.percentile(q)
+        result['max_ns'] = self.max
+        return result
+
+
+class _ProfiledTree:
+    """
+    Mixed in ahead of a tree class by profile(). Each operation records
+    its latency into self.latency[operation].
+    """
+
+    def contains(self, value: object):
+        """
+        Look value up, recording the latency into latency['contains'].
+        """
+        return self._timed('contains', super().contains, value)
+
+    def add(self, value: object):
+        """
+        Add value to the tree, recording the latency into latency['add'].
+        """
+        return self._timed('add', super().add, value)
+
+    def remove(self, value: object):
+        """
+        Remove value from the tree, recording the latency into
+        latency['remove'].
+        """
+        return self._timed('remove', super().remove, value)
+
+    def inorder_traversal(self):
+        """
+        Traverse the tree, recording the latency into
+        latency['inorder_traversal'].
+        """
+        return self._timed('inorder_traversal', super().inorder_traversal)
+
+    def _timed(self, operation: str, method, *args):
+        """
+        Run method, timing it if this call is sampled.
+        """
+        histogram = self.latency[operation]
+        histogram.calls += 1
+        if histogram.calls % histogram.sample_every:
+            return method(*args)
+        start = time.perf_counter_ns()
+        try:
+            return method(*args)
+        finally:
+            histogram.record(time.perf_counter_ns() - start)
+
+
+def profile(tree, sample_every: int = 1) -> dict:
+    """
+    Start recording latency histograms for contains, add, remove and
+    inorder_traversal on tree, timing one call out of every
+    sample_every. Return the live dict mapping each operation to its
+    LatencyHistogram, which is also available as tree.latency. The
+    timing is added with add_mixin().
+    """
+    if not isinstance(tree, _ProfiledTree):
+        tree.latency = {operation: LatencyHistogram(sample_every)
+                        for operation in OPERATIONS}
+        add_mixin(tree, _ProfiledTree)
+    return tree.latency
+
+
+def unprofile(tree) -> dict:
+    """
+    Stop recording and return the final histograms.
+    """
+    remove_mixin(tree, _ProfiledTree)
+    latency = tree.latency
+    del tree.latency
+    return latency
+
+
+def _write_atomically(path: str, text: str) -> None:
+    """
+    Write text to path through a temporary file in the same directory,
+    so readers never see a half written file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as fp:
+            fp.write(text)
+        # mkstemp makes the file private; scrapers run as other users
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def dump_json(tree, path: str) -> None:
+    """
+    Write the summary of every histogram of a profiled tree to path as
+    a JSON object keyed by operation.
+    """
+    report = {operation: histogram.summary()
+              for operation, histogram in tree.latency.items()}
+    _write_atomically(path, json.dumps(report, indent=2) + '\n')
+
+
+def prometheus_text(tree, name: str = 'tree') -> str:
+    """
+    Return the histograms of a profiled tree in the Prometheus text
+    exposition format: a summary with quantiles, sum and count per
+    operation, plus a gauge with the maximum. name goes into the tree
+    label of every sample.
+    """
+    metric = 'tree_operation_latency_seconds'
+    lines = ['# HELP {} Latency of sampled tree operations.'.format(metric),
+             '# TYPE {} summary'.format(metric)]
+    maxima = ['# HELP {}_max Slowest sampled tree operation.'.format(metric),
+              '# TYPE {}_max gauge'.format(metric)]
+    for operation, histogram in tree.latency.items():
+        labels = 'tree="{}",operation="{}"'.format(name, operation)
+        for q in QUANTILES:
+            value = '{:.9f}'.format(histogram.percentile(q) / 1e9) if histogram.count else 'NaN'
+            lines.append('{}{{{},quantile="{:g}"}} {}'.format(metric, labels, q, value))
+        lines.append('{}_sum{{{}}} {:.9f}'.format(metric, labels, histogram.total / 1e9))
+        lines.append('{}_count{{{}}} {}'.format(metric, labels, histogram.count))
+        maxima.append('{}_max{{{}}} {:.9f}'.format(metric, labels, histogram.max / 1e9))
+    return '\n'.join(lines + maxima) + '\n'
+
+
+def dump_prometheus(tree, path: str, name: str = 'tree') -> None:
+    """
+    Write prometheus_text(tree, name) to path, e.g. for the node
+    exporter's textfile collector.
+    """
+    _write_atomically(path, prometheus_text(tree, name))
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nAVL latency example 1")
+    print("---------------------------------")
+    tree = AVL()
+    latency = profile(tree)
+    for value in random.sample(range(200000), 100000):
+        tree.add(value)
+    for value in range(0, 200000, 2):
+        tree.contains(value)
+    for value in range(0, 200000, 3):
+        tree.remove(value)
+    tree.inorder_traversal()
+    for operation, histogram in latency.items():
+        print(operation, histogram.summary())
+
+    print("\nsampled profiling example 1")
+    print("---------------------------------")
+    unprofile(tree)
+    latency = profile(tree, sample_every=100)
+    for value in range(100000):
+        tree.contains(value)
+    print(latency['contains'].summary())
+
+    print("\nPrometheus text example 1")
+    print("---------------------------------")
+    print(prometheus_text(tree, 'example'), end='')
+
+    print("\ndump_json() / dump_prometheus() example 1")
+    print("---------------------------------")
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, 'latency.json')
+        prom_path = os.path.join(directory, 'latency.prom')
+        dump_json(tree, json_path)
+        dump_prometheus(tree, prom_path)
+        with open(json_path) as fp:
+            print(sorted(json.load(fp)))
+        print(sorted(os.listdir(directory)))
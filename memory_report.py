@@ -0,0 +1,66 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file measures the memory used per node by each of the
+#              tree implementations
+
+
+import sys
+import tracemalloc
+from bst import BST
+from avl import AVL
+from order_statistic import OrderStatisticAVL
+from array_avl import ArrayAVL
+
+
+def bytes_per_node(tree_class, count: int = 100000) -> float:
+    """
+    Build a tree of the given class with count nodes and return the
+    number of bytes allocated per node, not counting the values
+    themselves (they are created before measuring starts).
+    """
+    values = list(range(count))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tree = tree_class.bulk_load(values)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # the sorted copy made by bulk_load is freed by now, so what is left
+    # is the tree itself
+    del tree
+    return (after - before) / count
+
+
+def memory_report(count: int = 100000) -> dict:
+    """
+    Return a dict mapping each tree class name to its measured bytes per
+    node and the shallow size of a single node object.
+    """
+    report = {}
+    for tree_class in (BST, AVL, OrderStatisticAVL):
+        node = tree_class.bulk_load([0]).get_root()
+        report[tree_class.__name__] = {
+            'bytes_per_node': round(bytes_per_node(tree_class, count), 1),
+            'node_object_size': sys.getsizeof(node),
+        }
+
+    # the array-backed tree has no node objects at all
+    report[ArrayAVL.__name__] = {
+        'bytes_per_node': round(bytes_per_node(ArrayAVL, count), 1),
+        'node_object_size': 0,
+    }
+    return report
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nmemory per node (100000 nodes)")
+    print("---------------------------------")
+    for name, row in memory_report().items():
+        print('{:<20} {:>8} bytes/node  (node object: {} bytes)'.format(
+            name, row['bytes_per_node'], row['node_object_size']))
@@ -0,0 +1,219 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file implements an order-statistic AVL tree, where
+#              every node also stores the size of its subtree
+
+
+import random
+from queue_and_stack import Stack
+from avl import AVLNode, AVL
+
+
+class OSAVLNode(AVLNode):
+    """
+    Order-statistic AVL Tree Node class. Inherits from AVLNode
+    """
+
+    __slots__ = ('size',)
+
+    def __init__(self, value: object) -> None:
+        """
+        Initialize a new order-statistic AVL node
+        """
+        super().__init__(value)
+
+        # number of nodes in the subtree rooted at this node
+        self.size = 1
+
+
+class OrderStatisticAVL(AVL):
+    """
+    AVL Tree that keeps subtree sizes on every node. Inherits from AVL
+
+    Sizes are maintained by _update_height(), which the AVL retrace and
+    rotation code calls on every node whose children change, and by
+    _after_retrace() for the ancestors above an early retrace stop.
+    """
+
+    def __str__(self) -> str:
+        """
+        Override string method
+        """
+        values = []
+        super()._str_helper(self._root, values)
+        return "OS-AVL pre-order { " + ", ".join(values) + " }"
+
+    def __len__(self) -> int:
+        """
+        Return the number of values in the tree.
+
+        Implemented with O(1) runtime complexity.
+        """
+        return self._root.size if self._root else 0
+
+    def _make_node(self, value: object) -> OSAVLNode:
+        """
+        Create a new node that carries a subtree size.
+        """
+        return OSAVLNode(value)
+
+    def _update_height(self, node: OSAVLNode) -> None:
+        """
+        Update the height and subtree size of a given node based on its
+        children.
+        """
+        super()._update_height(node)
+        left_size = node.left.size if node.left else 0
+        right_size = node.right.size if node.right else 0
+        node.size = 1 + left_size + right_size
+
+    def _after_retrace(self, node: OSAVLNode) -> None:
+        """
+        Heights stop changing part way up, but every ancestor's size
+        still does, so finish the walk to the root updating sizes only.
+        """
+        while node is not None:
+            left_size = node.left.size if node.left else 0
+            right_size = node.right.size if node.right else 0
+            node.size = 1 + left_size + right_size
+            node = node.parent
+
+    def _finish_load(self) -> None:
+        """
+        Sizes are not stored in snapshot files, so recompute them for
+        every node in post-order after load().
+        """
+        order = list(self._nodes())
+        for node in reversed(order):
+            left_size = node.left.size if node.left else 0
+            right_size = node.right.size if node.right else 0
+            node.size = 1 + left_size + right_size
+
+    def is_valid_avl(self) -> bool:
+        """
+        Check the AVL properties and, in addition, that every node's
+        size matches the sizes of its children.
+        """
+        if not super().is_valid_avl():
+            return False
+        for node in self._nodes():
+            left_size = node.left.size if node.left else 0
+            right_size = node.right.size if node.right else 0
+            if node.size != 1 + left_size + right_size:
+                return False
+        return True
+
+    def _nodes(self):
+        """
+        Helper method for is_valid_avl. Yields every node in pre-order.
+        """
+        stack = Stack()
+        stack.push(self._root)
+        while not stack.is_empty():
+            node = stack.pop()
+            if node:
+                yield node
+                stack.push(node.right)
+                stack.push(node.left)
+
+    # ------------------------------------------------------------------ #
+
+    def select(self, k: int) -> object:
+        """
+        Return the k-th smallest value in the tree (0-based).
+        Raises IndexError if k is out of range.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError("select index out of range")
+
+        node = self._root
+        while True:
+            left_size = node.left.size if node.left else 0
+            if k < left_size:
+                node = node.left
+            elif k == left_size:
+                return node.value
+            else:
+                k -= left_size + 1
+                node = node.right
+
+    def rank(self, value: object) -> int:
+        """
+        Return the number of values in the tree that are less than the
+        given value. The value does not need to be in the tree.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        rank = 0
+        node = self._root
+        while node is not None:
+            if value <= node.value:
+                node = node.left
+            else:
+                rank += 1 + (node.left.size if node.left else 0)
+                node = node.right
+        return rank
+
+    def quantile(self, q: float) -> object:
+        """
+        Return the value at quantile q (0 <= q <= 1), using the lower
+        value when q falls between two ranks. Raises ValueError for q
+        outside [0, 1] and IndexError if the tree is empty.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("quantile must be between 0 and 1")
+        if self._root is None:
+            raise IndexError("quantile of empty tree")
+        return self.select(int(q * (len(self) - 1)))
+
+    def median(self) -> object:
+        """
+        Return the lower median of the values in the tree.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        return self.quantile(0.5)
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nmethod select() example 1")
+    print("---------------------------------")
+    tree = OrderStatisticAVL([10, 20, 5, 15, 17, 7, 12])
+    print(tree)
+    print([tree.select(k) for k in range(len(tree))])
+
+    print("\nmethod rank() example 1")
+    print("---------------------------------")
+    print([tree.rank(value) for value in (4, 5, 13, 20, 21)])
+
+    print("\nmethod quantile() example 1")
+    print("---------------------------------")
+    print("Median is:", tree.median())
+    print("p90 is:", tree.quantile(0.9))
+
+    print("\nstress test")
+    print("---------------------------------")
+    for _ in range(100):
+        case = list(set(random.randrange(1, 20000) for _ in range(900)))
+        tree = OrderStatisticAVL(case)
+        for value in case[::2]:
+            tree.remove(value)
+        expected = sorted(case[1::2])
+        if not tree.is_valid_avl() or len(tree) != len(expected):
+            raise Exception("PROBLEM WITH SIZE MAINTENANCE")
+        k = random.randrange(len(expected))
+        if tree.select(k) != expected[k] or tree.rank(expected[k]) != k:
+            raise Exception("PROBLEM WITH SELECT / RANK")
+    print('order statistic stress test finished')
@@ -0,0 +1,288 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file implements parallel bulk builds and set operations
+#              for AVL trees using a process pool
+
+
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from avl import AVL
+from keyed_avl import KeyedAVL
+
+
+# below this many values (in the smaller tree, for set operations) the
+# cost of starting processes and copying keys outweighs the work, so
+# everything is done in the calling process
+MIN_PARALLEL_SIZE = 50000
+
+# when one tree is more than this many times the size of the other, the
+# join-based AVL set operations only do work proportional to the smaller
+# tree, which is less than copying the larger tree's keys out would cost
+MAX_SIZE_RATIO = 4
+
+
+def _sort_piece(values: list) -> list:
+    """
+    Worker function. Return one chunk of the input values sorted.
+    """
+    values.sort()
+    return values
+
+
+def _set_operation_piece(args: tuple) -> list:
+    """
+    Worker function. Merge the sorted keys of one key range of both trees
+    and return the sorted keys of the result of the set operation.
+    """
+    operation, first, second = args
+    result = []
+    i = j = 0
+    while i < len(first) and j < len(second):
+        if first[i] < second[j]:
+            if operation != 'intersection':
+                result.append(first[i])
+            i += 1
+        elif second[j] < first[i]:
+            if operation == 'union':
+                result.append(second[j])
+            j += 1
+        else:
+            if operation != 'difference':
+                result.append(first[i])
+            i += 1
+            j += 1
+    if operation != 'intersection':
+        result.extend(first[i:])
+    if operation == 'union':
+        result.extend(second[j:])
+    return result
+
+
+def _top_pivots(node, depth: int) -> list:
+    """
+    Return, in ascending order, the values of the nodes in the top depth
+    levels of a subtree. In a balanced tree these split it into parts of
+    similar size.
+    """
+    if node is None or depth == 0:
+        return []
+    return (_top_pivots(node.left, depth - 1) + [node.value] +
+            _top_pivots(node.right, depth - 1))
+
+
+def _join_pieces(tree_class, pieces: list, pivots: list, keep: list) -> AVL:
+    """
+    Join the result trees of consecutive key ranges back into one tree.
+    pivots[i] lies between pieces[i] and pieces[i + 1] and is included
+    in the result if keep[i] is True.
+    """
+    result = pieces[0]
+    for pivot, kept, piece in zip(pivots, keep, pieces[1:]):
+        if kept:
+            result = tree_class.join(result, pivot, piece)
+        else:
+            # disjoint key ranges, so the union only walks one spine
+            result = result.union(piece)
+    return result
+
+
+def _worth_splitting(first: AVL, second: AVL) -> bool:
+    """
+    Return True if both trees are large enough, and close enough in
+    size, for a parallel set operation to beat the serial one. Takes
+    time proportional to the smaller tree.
+    """
+    # Count both trees in step, which stops at the end of the smaller one
+    smaller = sum(1 for _ in zip(first, second))
+    if smaller < MIN_PARALLEL_SIZE:
+        return False
+    limit = smaller * MAX_SIZE_RATIO + 1
+    larger = max(sum(1 for _ in islice(first, limit)),
+                 sum(1 for _ in islice(second, limit)))
+    return larger < limit
+
+
+def parallel_bulk_load(values, workers: int = None, tree_class=AVL) -> AVL:
+    """
+    Build a tree from an iterable, sorting the values in parallel.
+
+    The values are cut into one contiguous chunk per worker process and
+    each worker sends back its chunk sorted. Merging the sorted runs is
+    a single linear pass of the list sort, and the tree is then built
+    from the merged keys in this process, so only keys are copied
+    between processes, never nodes.
+    """
+    values = list(values)
+    workers = workers or os.cpu_count()
+    if workers <= 1 or len(values) < MIN_PARALLEL_SIZE or \
+            issubclass(tree_class, KeyedAVL):
+        return tree_class.bulk_load(values)
+
+    step = -(-len(values) // workers)
+    chunks = [values[i:i + step] for i in range(0, len(values), step)]
+    merged = []
+    with ProcessPoolExecutor(workers) as pool:
+        for run in pool.map(_sort_piece, chunks):
+            merged.extend(run)
+    merged.sort()
+    return tree_class.bulk_load(merged)
+
+
+def _parallel_set_operation(operation: str, first: AVL, second: AVL,
+                            workers: int) -> AVL:
+    """
+    Split both trees at pivots taken from the top of the first tree,
+    merge the sorted keys of each key range in a worker process, then
+    bulk build each range's result and join the results around the
+    pivots. Both input trees are left empty, as with the AVL methods.
+
+    Splitting costs O(log N) per pivot and only keys go to and from the
+    workers. When the trees are small or lopsided (see
+    _worth_splitting()), or the tree is a KeyedAVL whose key function
+    cannot be sent to a worker, the serial AVL method is used instead.
+    """
+    tree_class = type(first)
+    workers = workers or os.cpu_count()
+    if workers <= 1 or isinstance(first, KeyedAVL) or \
+            not _worth_splitting(first, second):
+        return getattr(first, operation)(second)
+
+    depth = max(1, (workers - 1).bit_length())
+    pivots = _top_pivots(first.get_root(), depth)
+
+    # Every pivot comes from the first tree, so only its presence in the
+    # second tree decides whether it belongs in the result
+    jobs = []
+    keep = []
+    for pivot in pivots:
+        first_less, _, first = first.split(pivot)
+        second_less, in_second, second = second.split(pivot)
+        jobs.append((operation, list(first_less), list(second_less)))
+        if operation == 'union':
+            keep.append(True)
+        elif operation == 'intersection':
+            keep.append(in_second)
+        else:
+            keep.append(not in_second)
+    jobs.append((operation, list(first), list(second)))
+    first.make_empty()
+    second.make_empty()
+
+    # Each piece is built here as soon as its keys come back, while the
+    # workers are still merging the later ranges
+    with ProcessPoolExecutor(workers) as pool:
+        pieces = [tree_class.bulk_load(keys)
+                  for keys in pool.map(_set_operation_piece, jobs)]
+    return _join_pieces(tree_class, pieces, pivots, keep)
+
+
+def parallel_union(first: AVL, second: AVL, workers: int = None) -> AVL:
+    """
+    Return a new tree holding the values that are in either tree,
+    computed in parallel. Both trees are left empty.
+    """
+    return _parallel_set_operation('union', first, second, workers)
+
+
+def parallel_intersection(first: AVL, second: AVL, workers: int = None) -> AVL:
+    """
+    Return a new tree holding the values that are in both trees,
+    computed in parallel. Both trees are left empty.
+    """
+    return _parallel_set_operation('intersection', first, second, workers)
+
+
+def parallel_difference(first: AVL, second: AVL, workers: int = None) -> AVL:
+    """
+    Return a new tree holding the values of first that are not in second,
+    computed in parallel. Both trees are left empty.
+    """
+    return _parallel_set_operation('difference', first, second, workers)
+
+
+def benchmark(size: int = 1000000, max_workers: int = None) -> list:
+    """
+    Time parallel_bulk_load, parallel_union and parallel_intersection
+    for 1, 2, 4, ... workers up to max_workers (default: the number of
+    CPUs). With one worker everything runs serially, so that first row
+    is the serial baseline the speedups are measured against. Return a
+    list of (workers, build seconds, union seconds, intersection
+    seconds, build speedup, union speedup, intersection speedup).
+
+    Building the nodes of the result always happens in this process, so
+    the speedup is limited by that serial part however many cores there
+    are.
+    """
+    max_workers = max_workers or os.cpu_count()
+    values = random.sample(range(size * 4), size)
+    other = random.sample(range(size * 4), size)
+
+    rows = []
+    workers = 1
+    while workers <= max_workers:
+        start = time.perf_counter()
+        parallel_bulk_load(values, workers)
+        build = time.perf_counter() - start
+
+        times = [build]
+        for function in (parallel_union, parallel_intersection):
+            first, second = AVL.bulk_load(values), AVL.bulk_load(other)
+            start = time.perf_counter()
+            function(first, second, workers)
+            times.append(time.perf_counter() - start)
+
+        base = rows[0][1:4] if rows else times
+        rows.append((workers, *times,
+                     *(serial / timed for serial, timed in zip(base, times))))
+        workers *= 2
+    return rows
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nparallel_bulk_load() example 1")
+    print("---------------------------------")
+    case = [random.randrange(1, 10 ** 7) for _ in range(200000)]
+    tree = parallel_bulk_load(case, 4)
+    if not tree.is_valid_avl() or list(tree) != sorted(set(case)):
+        raise Exception("PROBLEM WITH PARALLEL BULK LOAD")
+    print('parallel_bulk_load() test finished')
+
+    print("\nparallel set operations example 1")
+    print("---------------------------------")
+    first = set(random.randrange(1, 10 ** 6) for _ in range(200000))
+    second = set(random.randrange(1, 10 ** 6) for _ in range(100000))
+    for function, expected in ((parallel_union, first | second),
+                               (parallel_intersection, first & second),
+                               (parallel_difference, first - second)):
+        tree = function(AVL.bulk_load(first), AVL.bulk_load(second), 4)
+        if not tree.is_valid_avl() or list(tree) != sorted(expected):
+            raise Exception("PROBLEM WITH " + function.__name__.upper())
+    print('parallel set operations test finished')
+
+    print("\nlopsided union example 1")
+    print("---------------------------------")
+    # 3k values into 300k: both calls take the serial join-based path
+    big = random.sample(range(10 ** 7), 300000)
+    small = random.sample(range(10 ** 7), 3000)
+    for label, function in (('AVL.union', lambda a, b: a.union(b)),
+                            ('parallel_union', lambda a, b: parallel_union(a, b, 4))):
+        first, second = AVL.bulk_load(big), AVL.bulk_load(small)
+        start = time.perf_counter()
+        function(first, second)
+        print('{:<16} {:.3f}s'.format(label, time.perf_counter() - start))
+
+    print("\nbenchmark (1M keys)")
+    print("---------------------------------")
+    print('{:>8} {:>9} {:>9} {:>9} {:>8} {:>8} {:>8}'.format(
+        'workers', 'build s', 'union s', 'inter s', 'build x', 'union x', 'inter x'))
+    for row in benchmark():
+        print('{:>8} {:>9.3f} {:>9.3f} {:>9.3f} {:>8.2f} {:>8.2f} {:>8.2f}'.format(*row))
@@ -0,0 +1,363 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file implements a persistent (path-copying) AVL tree
+#              with O(1) read-only snapshots
+
+
+import random
+import threading
+from queue_and_stack import Stack
+from bst import BSTNode, BST, drop_duplicates
+
+
+class PersistentAVLNode(BSTNode):
+    """
+    Persistent AVL Tree Node class. Inherits from BSTNode
+
+    Nodes are never modified once they are part of a tree; every change
+    builds new nodes along the search path instead. They have no parent
+    pointer, since a node may be shared by many versions of the tree.
+    """
+
+    __slots__ = ('height',)
+
+    def __init__(self, value: object, left=None, right=None) -> None:
+        """
+        Initialize a new node with its children and compute its height
+        """
+        super().__init__(value)
+        self.left = left
+        self.right = right
+        self.height = 1 + max(left.height if left else -1,
+                              right.height if right else -1)
+
+    def __str__(self) -> str:
+        """
+        Override string method
+        """
+        return 'Persistent AVL Node: {}'.format(self.value)
+
+
+def _height(node: PersistentAVLNode) -> int:
+    """
+    Return the height of node, or -1 for an empty subtree.
+    """
+    return node.height if node else -1
+
+
+def _balanced(value: object, left: PersistentAVLNode,
+              right: PersistentAVLNode) -> PersistentAVLNode:
+    """
+    Return a new node for value with the given children, doing the
+    single or double rotation needed if their heights differ by two.
+    Only the nodes that change position are copied.
+    """
+    balance = _height(left) - _height(right)
+
+    # Left Heavy
+    if balance > 1:
+        if _height(left.left) < _height(left.right):
+            # Left Right Case
+            pivot = left.right
+            return PersistentAVLNode(
+                pivot.value,
+                PersistentAVLNode(left.value, left.left, pivot.left),
+                PersistentAVLNode(value, pivot.right, right))
+        # Left Left Case
+        return PersistentAVLNode(left.value, left.left,
+                                 PersistentAVLNode(value, left.right, right))
+
+    # Right Heavy
+    if balance < -1:
+        if _height(right.right) < _height(right.left):
+            # Right Left Case
+            pivot = right.left
+            return PersistentAVLNode(
+                pivot.value,
+                PersistentAVLNode(value, left, pivot.left),
+                PersistentAVLNode(right.value, pivot.right, right.right))
+        # Right Right Case
+        return PersistentAVLNode(right.value,
+                                 PersistentAVLNode(value, left, right.left),
+                                 right.right)
+
+    return PersistentAVLNode(value, left, right)
+
+
+class PersistentAVL(BST):
+    """
+    Persistent AVL Tree class. Inherits the read-only methods from BST
+
+    add() and remove() copy the O(log N) nodes on the search path and
+    then publish the new root with a single assignment, so the previous
+    version is never modified. snapshot() returns a read-only tree that
+    shares every node with the live one and can be read from any thread
+    while a writer keeps changing the live tree.
+    """
+
+    _snapshot_kind = b'avl'
+
+    def __init__(self, start_tree=None) -> None:
+        """
+        Initialize a new persistent AVL Tree
+        """
+        self._frozen = False
+        self._size = 0
+        self._version = 0
+        self._write_lock = threading.Lock()
+        super().__init__(start_tree)
+
+    def __str__(self) -> str:
+        """
+        Override string method; display in pre-order
+        """
+        values = []
+        super()._str_helper(self._root, values)
+        return "Persistent AVL pre-order { " + ", ".join(values) + " }"
+
+    def __len__(self) -> int:
+        """
+        Return the number of values in this version of the tree.
+        """
+        return self._size
+
+    @property
+    def version(self) -> int:
+        """
+        Number of changes made to the tree so far. A snapshot keeps the
+        version it was taken at.
+        """
+        return self._version
+
+    def snapshot(self) -> 'PersistentAVL':
+        """
+        Return a read-only view of the current version of the tree. A
+        snapshot never changes, so a snapshot of a snapshot is itself.
+
+        Implemented with O(1) runtime complexity.
+        """
+        if self._frozen:
+            return self
+        with self._write_lock:
+            view = PersistentAVL.__new__(PersistentAVL)
+            view._root = self._root
+            view._size = self._size
+            view._version = self._version
+            view._frozen = True
+            view._write_lock = None
+        return view
+
+    def is_valid_avl(self) -> bool:
+        """
+        Return False if any node has a wrong height, is out of balance or
+        breaks the ordering of values.
+        """
+        stack = Stack()
+        stack.push((self._root, None, None))
+        while not stack.is_empty():
+            node, low, high = stack.pop()
+            if node is None:
+                continue
+            if (low is not None and not low < node.value) or \
+                    (high is not None and not node.value < high):
+                return False
+            left, right = _height(node.left), _height(node.right)
+            if node.height != 1 + max(left, right) or abs(left - right) > 1:
+                return False
+            stack.push((node.right, node.value, high))
+            stack.push((node.left, low, node.value))
+        return True
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: object) -> bool:
+        """
+        Add a new value to the tree. Duplicate values are not allowed.
+        Return True if the value was added.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        self._check_writable()
+        with self._write_lock:
+            root = self._insert(self._root, value)
+            if root is self._root:
+                return False
+            self._publish(root, self._size + 1)
+            return True
+
+    def remove(self, value: object) -> bool:
+        """
+        Remove a value from the tree. Return True if it was present.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        self._check_writable()
+        with self._write_lock:
+            root = self._delete(self._root, value)
+            if root is self._root:
+                return False
+            self._publish(root, self._size - 1)
+            return True
+
+    def make_empty(self) -> None:
+        """
+        Remove all of the values from the tree. Existing snapshots are
+        not affected.
+        """
+        self._check_writable()
+        with self._write_lock:
+            self._publish(None, 0)
+
+    def _check_writable(self) -> None:
+        """
+        Raise TypeError if this tree is a read-only snapshot.
+        """
+        if self._frozen:
+            raise TypeError("snapshot of a PersistentAVL is read-only")
+
+    def _publish(self, root: PersistentAVLNode, size: int) -> None:
+        """
+        Make root the current version of the tree.
+        """
+        self._root = root
+        self._size = size
+        self._version += 1
+
+    def _insert(self, node: PersistentAVLNode, value: object) -> PersistentAVLNode:
+        """
+        Return the root of a new version of the subtree with value added,
+        or node itself if value is already present.
+        """
+        if node is None:
+            return self._make_node(value)
+        if value < node.value:
+            left = self._insert(node.left, value)
+            if left is node.left:
+                return node
+            return _balanced(node.value, left, node.right)
+        if node.value < value:
+            right = self._insert(node.right, value)
+            if right is node.right:
+                return node
+            return _balanced(node.value, node.left, right)
+        return node
+
+    def _delete(self, node: PersistentAVLNode, value: object) -> PersistentAVLNode:
+        """
+        Return the root of a new version of the subtree with value
+        removed, or node itself if value is not present.
+        """
+        if node is None:
+            return None
+        if value < node.value:
+            left = self._delete(node.left, value)
+            if left is node.left:
+                return node
+            return _balanced(node.value, left, node.right)
+        if node.value < value:
+            right = self._delete(node.right, value)
+            if right is node.right:
+                return node
+            return _balanced(node.value, node.left, right)
+
+        # Node with only one child or no child
+        if node.left is None:
+            return node.right
+        if node.right is None:
+            return node.left
+
+        # Node with two children: take the inorder successor's value
+        right, successor = self._delete_min(node.right)
+        return _balanced(successor, node.left, right)
+
+    def _delete_min(self, node: PersistentAVLNode) -> tuple:
+        """
+        Return a tuple (new subtree without its smallest value, that value).
+        """
+        if node.left is None:
+            return node.right, node.value
+        left, smallest = self._delete_min(node.left)
+        return _balanced(node.value, left, node.right), smallest
+
+    def _make_node(self, value: object) -> PersistentAVLNode:
+        """
+        Create a new leaf for value. Used by add() and by load(), which
+        links the nodes up before the tree is published.
+        """
+        return PersistentAVLNode(value)
+
+    @classmethod
+    def bulk_load(cls, values) -> 'PersistentAVL':
+        """
+        Build a new, perfectly balanced tree from an iterable (see
+        BST.bulk_load) and publish it as the first version.
+        """
+        tree = super().bulk_load(values)
+        tree._publish(tree._root, tree._size)
+        return tree
+
+    def _finish_load(self) -> None:
+        """
+        Publish a tree read by load() as its first version.
+        """
+        self._publish(self._root, sum(1 for _ in self))
+
+    def _prepare_bulk_values(self, values: list) -> list:
+        """
+        Helper method for bulk_load. Drops duplicates from the sorted
+        values and records the size of the tree being built, which
+        bulk_load() publishes.
+        """
+        unique = drop_duplicates(values)
+        self._size = len(unique)
+        return unique
+
+    def _build_balanced(self, values: list, lo: int, hi: int) -> PersistentAVLNode:
+        """
+        Helper method for bulk_load. Builds a subtree from values[lo:hi].
+        """
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        return PersistentAVLNode(values[mid],
+                                 self._build_balanced(values, lo, mid),
+                                 self._build_balanced(values, mid + 1, hi))
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nmethod add() example 1")
+    print("----------------------------")
+    for case in ((1, 2, 3), (3, 2, 1), (1, 3, 2), (3, 1, 2),
+                 (10, 20, 30, 40, 50), (1, 1, 1, 1)):
+        tree = PersistentAVL(case)
+        print('INPUT  :', case)
+        print('RESULT :', tree)
+
+    print("\nmethod snapshot() example 1")
+    print("----------------------------")
+    tree = PersistentAVL([10, 20, 5, 15, 17, 7, 12])
+    snapshot = tree.snapshot()
+    tree.remove(10)
+    tree.add(99)
+    print('LIVE     :', list(tree))
+    print('SNAPSHOT :', list(snapshot))
+
+    print("\nstress test")
+    print("----------------------------")
+    for _ in range(100):
+        case = list(set(random.randrange(1, 20000) for _ in range(900)))
+        tree = PersistentAVL(case)
+        before = tree.snapshot()
+        for value in case[::2]:
+            tree.remove(value)
+        if not tree.is_valid_avl() or list(tree) != sorted(case[1::2]):
+            raise Exception("PROBLEM WITH ADD / REMOVE OPERATION")
+        if list(before) != sorted(case) or len(before) != len(case):
+            raise Exception("PROBLEM WITH SNAPSHOT")
+    print('add() / remove() / snapshot() stress test finished')
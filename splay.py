@@ -0,0 +1,237 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file implements a splay tree, where every accessed
+#              value is moved to the root
+
+
+import random
+import time
+from itertools import accumulate
+from bst import BSTNode, BST, drop_duplicates
+from avl import AVL
+
+
+class SplayTree(BST):
+    """
+    Splay Tree class. Inherits from BST
+
+    contains, add and remove splay the accessed value to the root with
+    top-down splaying, so frequently used values stay near the top. Every
+    operation is O(log N) amortized. Duplicate values are not allowed,
+    as in the AVL tree. Note that contains() changes the shape of the
+    tree, so concurrent readers need the same locking as writers.
+    """
+
+    def __str__(self) -> str:
+        """
+        Override string method
+        """
+        values = []
+        super()._str_helper(self._root, values)
+        return "Splay pre-order { " + ", ".join(values) + " }"
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: object) -> bool:
+        """
+        Add a new value to the tree and make it the root. Return True if
+        it was added and False if it was already in the tree.
+
+        Implemented with O(log N) amortized runtime complexity.
+        """
+        if self._root is None:
+            self._root = self._make_node(value)
+            return True
+
+        root = self._splay(self._root, value)
+        self._root = root
+        if root.value == value:
+            return False
+
+        # The splayed root is the neighbour of value; split it around
+        # the new node
+        node = self._make_node(value)
+        if value < root.value:
+            node.left = root.left
+            node.right = root
+            root.left = None
+        else:
+            node.right = root.right
+            node.left = root
+            root.right = None
+        self._root = node
+        return True
+
+    def remove(self, value: object) -> bool:
+        """
+        Remove a value from the tree. Return True if it was present.
+
+        Implemented with O(log N) amortized runtime complexity.
+        """
+        if self._root is None:
+            return False
+        root = self._splay(self._root, value)
+        if root.value != value:
+            self._root = root
+            return False
+
+        # Splaying the left subtree for value brings its maximum to the
+        # top, which then has no right child to take the right subtree
+        if root.left is None:
+            self._root = root.right
+        else:
+            self._root = self._splay(root.left, value)
+            self._root.right = root.right
+        return True
+
+    def contains(self, value: object) -> bool:
+        """
+        Return True if the value is in the tree. The value (or its
+        closest neighbour) becomes the root.
+
+        Implemented with O(log N) amortized runtime complexity.
+        """
+        if self._root is None:
+            return False
+        self._root = self._splay(self._root, value)
+        return self._root.value == value
+
+    def _prepare_bulk_values(self, values: list) -> list:
+        """
+        Helper method for bulk_load. Drops duplicates from the sorted
+        values, since they are not allowed in the splay tree.
+        """
+        return drop_duplicates(values)
+
+    def _splay(self, node: BSTNode, value: object) -> BSTNode:
+        """
+        Top-down splay: return the new root of the subtree at node, which
+        holds value if present or else the last value on its search path.
+        """
+        # header.right collects the tree of smaller values, header.left
+        # the tree of larger values
+        header = BSTNode(None)
+        left_max = right_min = header
+        while True:
+            if value < node.value:
+                if node.left is None:
+                    break
+                if value < node.left.value:
+                    # Rotate right
+                    child = node.left
+                    node.left = child.right
+                    child.right = node
+                    node = child
+                    if node.left is None:
+                        break
+                # Link right
+                right_min.left = node
+                right_min = node
+                node = node.left
+            elif node.value < value:
+                if node.right is None:
+                    break
+                if node.right.value < value:
+                    # Rotate left
+                    child = node.right
+                    node.right = child.left
+                    child.left = node
+                    node = child
+                    if node.right is None:
+                        break
+                # Link left
+                left_max.right = node
+                left_max = node
+                node = node.right
+            else:
+                break
+
+        # Assemble
+        left_max.right = node.left
+        right_min.left = node.right
+        node.left = header.right
+        node.right = header.left
+        return node
+
+
+def zipf_keys(keys: list, count: int, exponent: float = 1.1, seed: int = 0) -> list:
+    """
+    Return count keys drawn from keys with a Zipf distribution: the key
+    of rank r is drawn with probability proportional to 1 / r ** exponent.
+    Ranks are assigned to keys at random.
+    """
+    rng = random.Random(seed)
+    ranked = list(keys)
+    rng.shuffle(ranked)
+    weights = accumulate(1 / rank ** exponent for rank in range(1, len(ranked) + 1))
+    return rng.choices(ranked, cum_weights=list(weights), k=count)
+
+
+def benchmark(size: int = 100000, lookups: int = 200000,
+              exponents=(0.0, 0.8, 1.1, 1.5)) -> list:
+    """
+    Time contains() lookups on a SplayTree and an AVL holding the same
+    keys, for Zipf workloads of increasing skew (exponent 0 is uniform).
+    Return a list of (exponent, splay ops/sec, AVL ops/sec).
+    """
+    keys = random.Random(1).sample(range(size * 10), size)
+    rows = []
+    for exponent in exponents:
+        workload = zipf_keys(keys, lookups, exponent)
+        result = [exponent]
+        for tree in (SplayTree(keys), AVL.bulk_load(keys)):
+            start = time.perf_counter()
+            for value in workload:
+                tree.contains(value)
+            result.append(lookups / (time.perf_counter() - start))
+        rows.append(tuple(result))
+    return rows
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nmethod add() example 1")
+    print("----------------------------")
+    test_cases = (
+        (1, 2, 3),
+        (3, 2, 1),
+        (10, 20, 30, 40, 50),
+        ('A', 'B', 'C', 'D', 'E'),
+        (1, 1, 1, 1),
+    )
+    for case in test_cases:
+        tree = SplayTree(case)
+        print('INPUT  :', case)
+        print('RESULT :', tree)
+
+    print("\nmethod contains() example 1")
+    print("---------------------------------")
+    tree = SplayTree([10, 5, 15, 3, 7])
+    print(tree.contains(3), tree)
+    print(tree.contains(-10), tree)
+
+    print("\nstress test")
+    print("---------------------------------")
+    for _ in range(100):
+        case = list(set(random.randrange(1, 20000) for _ in range(900)))
+        tree = SplayTree(case)
+        for value in case[::2]:
+            tree.remove(value)
+        expected = set(case[1::2])
+        for value in random.sample(range(1, 20000), 200):
+            if tree.contains(value) != (value in expected):
+                raise Exception("PROBLEM WITH CONTAINS OPERATION")
+        if not tree.is_valid_bst() or list(tree) != sorted(expected):
+            raise Exception("PROBLEM WITH ADD / REMOVE OPERATION")
+    print('add() / remove() stress test finished')
+
+    print("\nZipf benchmark (100000 keys, 200000 lookups)")
+    print("---------------------------------")
+    print('{:>9} {:>14} {:>14}'.format('exponent', 'splay ops/s', 'AVL ops/s'))
+    for row in benchmark():
+        print('{:>9} {:>14.0f} {:>14.0f}'.format(*row))
@@ -0,0 +1,64 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file adds and removes optional behaviour (counters,
+#              profiling, change tracking) on a single tree object by
+#              swapping its class for a subclass with a mixin in front
+
+
+# (mixin, class) -> subclass of class with mixin in front
+_mixed_classes = {}
+# subclass -> (mixin, class) it was built from
+_mixed_parts = {}
+
+
+def _mixed_class(mixin, tree_class):
+    """
+    Return the cached subclass of tree_class with mixin in front.
+    """
+    if (mixin, tree_class) not in _mixed_classes:
+        name = mixin.__name__.lstrip('_').replace('Tree', '') + tree_class.__name__
+        mixed = type(name, (mixin, tree_class), {})
+        _mixed_classes[mixin, tree_class] = mixed
+        _mixed_parts[mixed] = (mixin, tree_class)
+    return _mixed_classes[mixin, tree_class]
+
+
+def add_mixin(tree, mixin) -> bool:
+    """
+    Put mixin in front of the class of tree, so its methods wrap the
+    tree's own. Return False (and change nothing) if the tree already
+    has it.
+
+    Only the one tree object changes class, so every other tree of the
+    same class keeps running its code with no added overhead. Mixins
+    stack: adding several wraps the tree in each of them in turn.
+    """
+    if isinstance(tree, mixin):
+        return False
+    tree.__class__ = _mixed_class(mixin, type(tree))
+    return True
+
+
+def remove_mixin(tree, mixin) -> None:
+    """
+    Take mixin out of the class of tree, keeping any other mixins that
+    were added before or after it. Raise TypeError if the tree does not
+    have it.
+    """
+    if not isinstance(tree, mixin):
+        raise TypeError('tree has no {}'.format(mixin.__name__))
+
+    # Peel mixins off from the outside in until reaching this one, then
+    # put the outer ones back in the same order
+    outer = []
+    tree_class = type(tree)
+    while True:
+        part, tree_class = _mixed_parts[tree_class]
+        if part is mixin:
+            break
+        outer.append(part)
+    for part in reversed(outer):
+        tree_class = _mixed_class(part, tree_class)
+    tree.__class__ = tree_class
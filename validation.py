@@ -0,0 +1,287 @@
+# Name: Ashlyn Musgrave
+# Course: CS261 - Data Structures
+# Assignment: Assignment 4 BST/AVL Tree Implementation
+# Due Date: November 20, 2023
+# Description: This file checks the tree invariants in full, along the
+#              paths changed since the last check, or by random sampling
+#              within a time budget
+
+
+import random
+import time
+from queue_and_stack import Stack
+from bst import BST
+from avl import AVL
+from keyed_avl import KeyedAVL
+from tree_mixins import add_mixin, remove_mixin
+
+
+def _node_key(node) -> object:
+    """
+    Return what node is ordered by: its cached key if it has one (the
+    nodes of a KeyedAVL), otherwise its value.
+    """
+    return node.key if hasattr(node, 'key') else node.value
+
+
+def _value_key(tree: BST, value: object) -> object:
+    """
+    Return what tree orders value by: key(value) for a KeyedAVL,
+    otherwise the value itself.
+    """
+    return tree._key(value) if isinstance(tree, KeyedAVL) else value
+
+
+def _node_ok(node, low: object, high: object) -> bool:
+    """
+    Return True if node lies within its bounds (low <= key < high, where
+    the key is as in _node_key() and None means unbounded) and agrees
+    with its children on every piece of node data it carries: parent
+    pointers, AVL heights and balance, subtree sizes and the red-black
+    rule.
+    """
+    key = _node_key(node)
+    if (low is not None and key < low) or (high is not None and not key < high):
+        return False
+    left, right = node.left, node.right
+
+    if hasattr(node, 'parent'):
+        if (left is not None and left.parent is not node) or \
+                (right is not None and right.parent is not node):
+            return False
+    if hasattr(node, 'height'):
+        left_height = left.height if left is not None else -1
+        right_height = right.height if right is not None else -1
+        if node.height != 1 + max(left_height, right_height) or \
+                abs(left_height - right_height) > 1:
+            return False
+    if hasattr(node, 'size'):
+        left_size = left.size if left is not None else 0
+        right_size = right.size if right is not None else 0
+        if node.size != 1 + left_size + right_size:
+            return False
+    if getattr(node, 'red', False):
+        if (left is not None and left.red) or (right is not None and right.red):
+            return False
+    return True
+
+
+def _root_ok(tree: BST) -> bool:
+    """
+    Return True if the root has no parent (when nodes have parents).
+    """
+    root = tree.get_root()
+    return root is None or getattr(root, 'parent', None) is None
+
+
+def is_valid(tree: BST) -> bool:
+    """
+    Check every node of the tree against the smallest and largest value
+    its position allows, not just against its own children: everything
+    in a left subtree must be smaller than the node and everything in a
+    right subtree at least as large (duplicates go right). A KeyedAVL
+    is checked by its cached keys. Node data is checked as in
+    _node_ok().
+
+    Implemented with O(N) runtime complexity.
+    """
+    if not _root_ok(tree):
+        return False
+    stack = Stack()
+    stack.push((tree.get_root(), None, None))
+    while not stack.is_empty():
+        node, low, high = stack.pop()
+        if node is None:
+            continue
+        if not _node_ok(node, low, high):
+            return False
+        key = _node_key(node)
+        stack.push((node.right, key, high))
+        stack.push((node.left, low, key))
+    return True
+
+
+def _path_ok(tree: BST, key: object) -> bool:
+    """
+    Check every node on the path an add of a value with the given key
+    would take, and the children of those nodes, against their bounds.
+    """
+    node = tree.get_root()
+    low = high = None
+    while node is not None:
+        node_key = _node_key(node)
+        if not _node_ok(node, low, high):
+            return False
+        if node.left is not None and not _node_ok(node.left, low, node_key):
+            return False
+        if node.right is not None and not _node_ok(node.right, node_key, high):
+            return False
+        if key < node_key:
+            node, high = node.left, node_key
+        else:
+            node, low = node.right, node_key
+    return True
+
+
+class _TrackedTree:
+    """
+    Mixed in ahead of a tree class by track_changes(). Remembers keys
+    (see _value_key()) whose search paths cover every node that add()
+    and remove() changed.
+    """
+
+    def add(self, value: object):
+        """
+        Add value to the tree, remembering its path.
+        """
+        self._touched.append(_value_key(self, value))
+        return super().add(value)
+
+    def remove(self, value: object):
+        """
+        Remove value from the tree, remembering the paths it changes.
+        """
+        # When a node with two children is removed, its successor is
+        # spliced out of the right subtree; the successor's path ends
+        # at that splice point and passes every node rebalanced above it
+        key = _value_key(self, value)
+        node = self.get_root()
+        while node is not None and (key < _node_key(node) or _node_key(node) < key):
+            node = node.left if key < _node_key(node) else node.right
+        if node is not None and node.left is not None and node.right is not None:
+            successor = node.right
+            while successor.left is not None:
+                successor = successor.left
+            self._touched.append(_node_key(successor))
+        self._touched.append(key)
+        return super().remove(value)
+
+    def make_empty(self) -> None:
+        """
+        Remove all of the nodes; an empty tree has no paths to check.
+        """
+        super().make_empty()
+        self._touched = []
+
+
+def track_changes(tree: BST) -> None:
+    """
+    Start remembering where add() and remove() change tree, so that
+    check_changes() can re-check just those paths. The tracking is
+    added with add_mixin(). It covers trees that are only changed
+    through add / remove (and make_empty): BST, AVL and the AVL
+    subclasses, including KeyedAVL. Rotations done while rebalancing
+    stay on the tracked paths.
+    """
+    if not isinstance(tree, _TrackedTree):
+        tree._touched = []
+        add_mixin(tree, _TrackedTree)
+
+
+def untrack_changes(tree: BST) -> None:
+    """
+    Stop remembering changes.
+    """
+    remove_mixin(tree, _TrackedTree)
+    del tree._touched
+
+
+def check_changes(tree: BST) -> bool:
+    """
+    Re-check the paths changed by add() and remove() since the last
+    call, then forget them. Return False if any invariant is broken.
+
+    Implemented with O(K log N) runtime complexity for K changes on a
+    balanced tree.
+    """
+    touched, tree._touched = tree._touched, []
+    if not touched:
+        return True
+    if not _root_ok(tree):
+        return False
+    for key in set(touched):
+        if not _path_ok(tree, key):
+            return False
+    return True
+
+
+def check_sampled(tree: BST, seconds: float, rng=random) -> bool:
+    """
+    Check random root-to-leaf paths (each node against its bounds and
+    its node data) until seconds have passed; at least one path is
+    always checked. Return False if any invariant is broken.
+
+    Nodes near the root are on every path, so they are checked most
+    often; over many calls every path gets checked.
+    """
+    if not _root_ok(tree):
+        return False
+    deadline = time.perf_counter() + seconds
+    while True:
+        node = tree.get_root()
+        low = high = None
+        while node is not None:
+            if not _node_ok(node, low, high):
+                return False
+            if rng.random() < 0.5:
+                node, high = node.left, _node_key(node)
+            else:
+                node, low = node.right, _node_key(node)
+        if time.perf_counter() >= deadline:
+            return True
+
+
+# ------------------- BASIC TESTING -----------------------------------------
+
+
+if __name__ == '__main__':
+
+    print("\nis_valid() example 1")
+    print("---------------------------------")
+    tree = BST([10, 5, 15])
+    # a grandchild that breaks ordering: 12 is in the left subtree of 10
+    tree.get_root().left.right = type(tree.get_root())(12)
+    print(tree.is_valid_bst(), is_valid(tree))
+
+    print("\ncheck_changes() example 1")
+    print("---------------------------------")
+    tree = AVL.bulk_load(range(100000))
+    track_changes(tree)
+    for value in random.sample(range(100000), 100):
+        tree.remove(value)
+        tree.add(value + 0.5)
+    print(check_changes(tree), check_changes(tree))
+    tree.get_root().left.height += 1
+    tree.add(-1)
+    print(check_changes(tree))
+
+    print("\nkeyed tree example 1")
+    print("---------------------------------")
+    words = ['pear', 'Fig', 'apple', 'Banana', 'cherry', 'Date', 'egg']
+    tree = KeyedAVL(words, key=str.lower)
+    track_changes(tree)
+    tree.remove('FIG')
+    tree.add('fig')
+    print(tree.is_valid_avl(), is_valid(tree), check_changes(tree),
+          check_sampled(tree, 0))
+
+    print("\ncheck_sampled() example 1")
+    print("---------------------------------")
+    tree = AVL.bulk_load(range(100000))
+    print(check_sampled(tree, 0.01))
+
+    print("\nstress test")
+    print("---------------------------------")
+    for _ in range(100):
+        case = list(set(random.randrange(1, 20000) for _ in range(900)))
+        tree = AVL()
+        track_changes(tree)
+        for value in case:
+            tree.add(value)
+        for value in case[::2]:
+            tree.remove(value)
+            if not check_changes(tree):
+                raise Exception("PROBLEM WITH CHECK_CHANGES OPERATION")
+        if not is_valid(tree) or not check_sampled(tree, 0):
+            raise Exception("PROBLEM WITH IS_VALID OPERATION")
+    print('validation stress test finished')